@@ -6,6 +6,7 @@ import json
 import os
 from dotenv import load_dotenv
 from llm_client import LLMHandler, ToolDefinition
+from llm_client import _json as fast_json  # 安装 orjson 时使用 orjson，否则退回标准库 json
 
 # 加载环境变量文件
 load_dotenv()
@@ -19,8 +20,8 @@ logging.basicConfig(
 # 从环境变量读取模型配置文件路径
 models_config_path = os.getenv("MODELS_CONFIG_PATH", "models.json")
 if os.path.exists(models_config_path):
-    with open(models_config_path, "r", encoding="utf-8") as f:
-        models_config = json.load(f)
+    with open(models_config_path, "rb") as f:
+        models_config = fast_json.loads(f.read())
 else:
     # 默认配置（如果没有配置文件）
     models_config = [
@@ -143,9 +144,9 @@ print(f"JSON 响应: {response}")
 
 # 验证可以解析为 JSON
 try:
-    parsed = json.loads(response)
+    parsed = fast_json.loads(response)
     print(f"解析后的 JSON: {json.dumps(parsed, indent=2, ensure_ascii=False)}")
-except json.JSONDecodeError:
+except ValueError:
     print("警告: 响应不是有效的 JSON")
 
 
@@ -193,7 +194,7 @@ response = handler.call_llm(
     messages,
     json_schema=complex_schema
 )
-print(f"复杂 JSON 响应:\n{json.dumps(json.loads(response), indent=2, ensure_ascii=False)}")
+print(f"复杂 JSON 响应:\n{json.dumps(fast_json.loads(response), indent=2, ensure_ascii=False)}")
 
 
 # ========== 示例 7: 错误处理 ==========
@@ -276,19 +277,22 @@ queries = [
     "机器学习算法"
 ]
 
-# 计算 embedding
-query_embeddings = [handler.embed_text(q, model_name="embedding") for q in queries]
+# 计算 embedding（一次批量请求，而不是每条文本一次请求）
+query_embeddings = handler.batch_embed_text(queries, model_name="embedding")
 
 # 计算相似度矩阵
 import numpy as np
-embeddings_array = np.array(query_embeddings)
 
-# 归一化
-norms = np.linalg.norm(embeddings_array, axis=1, keepdims=True)
-normalized_embeddings = embeddings_array / norms
+# 直接写入连续的 float32 数组，避免 np.array(list_of_lists) 的中间拷贝
+embeddings_array = np.empty((len(query_embeddings), len(query_embeddings[0])), dtype=np.float32)
+for i, emb in enumerate(query_embeddings):
+    embeddings_array[i] = emb
 
-# 计算余弦相似度
-similarity_matrix = np.dot(normalized_embeddings, normalized_embeddings.T)
+# 原地归一化
+embeddings_array /= np.linalg.norm(embeddings_array, axis=1, keepdims=True)
+
+# 计算余弦相似度（单次 BLAS 矩阵乘法）
+similarity_matrix = embeddings_array @ embeddings_array.T
 
 print("相似度矩阵:")
 for i, q1 in enumerate(queries):
@@ -10,10 +10,12 @@ from .handler import LLMHandler
 
 # 错误类型
 from .types import (
+    ErrorKind,
     LLMError,
     ModelNotFoundError,
     StreamParsingError,
     ClientError,
+    ValidationError,
 )
 
 # 公共 API 导出
@@ -21,10 +23,12 @@ __all__ = [
     # 主类
     "LLMHandler",
     # 错误类型
+    "ErrorKind",
     "LLMError",
     "ModelNotFoundError",
     "StreamParsingError",
     "ClientError",
+    "ValidationError",
     # 版本信息
     "__version__",
 ]
@@ -39,14 +43,23 @@ __all__ += [
     "ToolCall",
     "LLMCallOptions",
     "StreamChunk",
+    "StreamEvent",
+    "StreamEventKind",
+    "encode_chunk",
+    "decode_chunk",
     "ModelConfig",
     "OpenAIMessageBlock",
+    # 校验
+    "validate_messages",
+    "validate_tools",
+    "validate_json_output",
     # 解析器
     "StreamingJSONParser",
     "StreamResponseParser",
     # 客户端
     "BaseLLMClient",
     "OpenAIClient",
+    "ClientRegistry",
     # 适配器
     "ModelAdapter",
     "BaseModelAdapter",
@@ -62,10 +75,17 @@ from .types import (
     ToolCall,
     LLMCallOptions,
     StreamChunk,
+    StreamEvent,
+    StreamEventKind,
+    encode_chunk,
+    decode_chunk,
     ModelConfig,
     OpenAIMessageBlock,
+    validate_messages,
+    validate_tools,
+    validate_json_output,
 )
 
 from .parsers import StreamingJSONParser, StreamResponseParser
-from .clients import BaseLLMClient, OpenAIClient
+from .clients import BaseLLMClient, OpenAIClient, ClientRegistry
 from .config import ModelAdapter, BaseModelAdapter, GLMAdapter, get_adapter_for_model
\ No newline at end of file
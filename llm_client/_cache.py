@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""响应缓存模块 - 进程内精确匹配的 LRU + TTL 缓存"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from . import _json
+
+# 缓存未命中的标记对象（缓存值本身可能为 None 或空字符串）
+MISS = object()
+
+
+def make_cache_key(*parts: Any) -> bytes:
+    """
+    根据请求内容生成缓存键
+
+    所有部分按 key 排序序列化为 JSON 后计算 blake2b 摘要，
+    dict 中 key 的顺序不影响结果。
+
+    Args:
+        *parts: 参与缓存键计算的内容（模型名称、消息列表、调用选项等）
+
+    Returns:
+        16 字节摘要
+
+    Example:
+        >>> key = make_cache_key("main", [{"role": "user", "content": "hi"}], {"max_tokens": 10})
+        >>> len(key)
+        16
+    """
+    try:
+        payload = _json.dumps(list(parts), sort_keys=True)
+    except TypeError:
+        # 包含无法直接序列化的对象（如 PIL 图片）时退回标准库并使用 str()
+        import json
+        payload = json.dumps(list(parts), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+
+class ResponseCache:
+    """
+    线程安全的 LRU + TTL 缓存
+
+    超过 maxsize 时淘汰最久未使用的条目，超过 ttl 秒的条目在读取时失效。
+
+    Attributes:
+        maxsize: 最大条目数
+        ttl: 条目存活时间（秒），None 表示永不过期
+
+    Example:
+        >>> cache = ResponseCache(maxsize=1024, ttl=3600)
+        >>> key = make_cache_key("main", messages)
+        >>> value = cache.get(key)
+        >>> if value is MISS:
+        ...     value = call_api()
+        ...     cache.set(key, value)
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 3600):
+        """
+        初始化缓存
+
+        Args:
+            maxsize: 最大条目数
+            ttl: 条目存活时间（秒），None 表示永不过期
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[bytes, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> Any:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存值，未命中或已过期时返回 MISS
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISS
+            expires_at, value = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._data[key]
+                return MISS
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: bytes, value: Any) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0.0
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""JSON 编解码 shim - 优先使用 orjson，缺失时退回标准库 json"""
+
+from typing import Any, Union
+
+try:
+    import orjson
+
+    def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+        """解析 JSON 字符串或 bytes"""
+        return orjson.loads(data)
+
+    def dumps(obj: Any, sort_keys: bool = False) -> str:
+        """序列化为紧凑的 JSON 字符串（非 ASCII 字符原样保留）"""
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else None).decode("utf-8")
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """序列化为紧凑的 UTF-8 JSON bytes（用于 HTTP 请求体）"""
+        return orjson.dumps(obj)
+
+    # orjson.Fragment（3.9+）可把已序列化的 JSON 原样嵌入输出；更早的版本中 HAS_FRAGMENT 为 False，
+    # schema 片段嵌入不生效（pyproject 的 speedups 依赖要求 orjson>=3.9.0）
+    _Fragment = getattr(orjson, "Fragment", None)
+
+    def raw_fragment(text: str) -> Any:
+        """把已经是 JSON 的文本包装为片段；不支持时原样返回 text（作为 JSON 字符串嵌入）"""
+        return _Fragment(text) if _Fragment is not None else text
+
+    HAS_ORJSON = True
+    HAS_FRAGMENT = _Fragment is not None
+
+except ImportError:
+    import json
+
+    def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+        """解析 JSON 字符串或 bytes"""
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+    def dumps(obj: Any, sort_keys: bool = False) -> str:
+        """序列化为紧凑的 JSON 字符串（非 ASCII 字符原样保留）"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys)
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """序列化为紧凑的 UTF-8 JSON bytes（用于 HTTP 请求体）"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def raw_fragment(text: str) -> Any:
+        """把已经是 JSON 的文本包装为片段；不支持时原样返回 text（作为 JSON 字符串嵌入）"""
+        return text
+
+    HAS_ORJSON = False
+    HAS_FRAGMENT = False
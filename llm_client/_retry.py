@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""重试与熔断模块 - 批量调用中的瞬时故障处理"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import openai
+
+T = TypeVar("T")
+
+# 可重试的瞬时错误：限流、连接失败 / 超时、服务端 5xx
+_TRANSIENT_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    判断错误是否为瞬时错误
+
+    客户端会把 SDK 异常包装为 ClientError，因此沿 __cause__ 链向上查找。
+
+    Args:
+        error: 捕获的异常
+
+    Returns:
+        是瞬时错误时返回 True
+    """
+    current: Optional[BaseException] = error
+    while current is not None:
+        if isinstance(current, _TRANSIENT_ERRORS):
+            return True
+        current = current.__cause__
+    return False
+
+
+def _backoff(attempt: int, base_delay: float, jitter: float) -> float:
+    """第 attempt 次重试前的等待时间（指数退避 + 随机抖动）"""
+    return base_delay * (2 ** attempt) + random.uniform(0, jitter)
+
+
+def call_with_retry(
+    func: Callable[[], T],
+    retries: int = 2,
+    base_delay: float = 0.2,
+    jitter: float = 0.2,
+) -> T:
+    """
+    调用 func，遇到瞬时错误时按指数退避重试
+
+    Args:
+        func: 无参调用
+        retries: 最大重试次数（不含首次调用）
+        base_delay: 首次重试前的基础等待时间（秒）
+        jitter: 随机抖动上限（秒）
+
+    Returns:
+        func 的返回值
+
+    Raises:
+        Exception: 非瞬时错误立即抛出，瞬时错误在重试耗尽后抛出
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= retries or not is_transient(e):
+                raise
+            time.sleep(_backoff(attempt, base_delay, jitter))
+            attempt += 1
+
+
+async def acall_with_retry(
+    func: Callable[[], Awaitable[T]],
+    retries: int = 2,
+    base_delay: float = 0.2,
+    jitter: float = 0.2,
+) -> T:
+    """
+    call_with_retry 的异步版本，func 每次调用返回新的 awaitable
+
+    Raises:
+        Exception: 非瞬时错误立即抛出，瞬时错误在重试耗尽后抛出
+    """
+    attempt = 0
+    while True:
+        try:
+            return await func()
+        except Exception as e:
+            if attempt >= retries or not is_transient(e):
+                raise
+            await asyncio.sleep(_backoff(attempt, base_delay, jitter))
+            attempt += 1
+
+
+class CircuitBreaker:
+    """
+    连续失败熔断器
+
+    连续 threshold 次瞬时失败后进入熔断（open）状态，cooldown 秒内的请求直接失败；
+    冷却结束后进入半开（half-open）状态，只放行一个探测请求，其余请求在探测结束前仍直接失败。
+    探测成功即恢复（closed），探测失败则重新熔断。
+
+    Attributes:
+        threshold: 触发熔断的连续失败次数
+        cooldown: 熔断持续时间（秒）
+
+    Example:
+        >>> breaker = CircuitBreaker(threshold=5, cooldown=30)
+        >>> if breaker.allow():
+        ...     try:
+        ...         result = call()
+        ...         breaker.record_success()
+        ...     except Exception:
+        ...         breaker.record_failure()
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        """
+        初始化熔断器
+
+        Args:
+            threshold: 触发熔断的连续失败次数
+            cooldown: 熔断持续时间（秒）
+        """
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        当前是否允许发出请求
+
+        半开状态下第一个调用方获得探测资格并返回 True，调用方之后必须调用
+        record_success() 或 record_failure() 结束探测。
+        """
+        with self._lock:
+            if self._failures < self.threshold:
+                return True
+            if self._probing or time.monotonic() < self._open_until:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        """记录一次成功，重置失败计数并结束探测"""
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """记录一次瞬时失败，达到阈值时（重新）进入熔断状态"""
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._failures >= self.threshold:
+                self._open_until = time.monotonic() + self.cooldown
+
+    @property
+    def state(self) -> str:
+        """当前状态："closed"、"open" 或 "half_open"（不占用探测资格）"""
+        with self._lock:
+            if self._failures < self.threshold:
+                return "closed"
+            if self._probing or time.monotonic() < self._open_until:
+                return "open"
+            return "half_open"
+
+    @property
+    def is_open(self) -> bool:
+        """是否处于熔断状态（半开状态等待探测时不算熔断）"""
+        return self.state == "open"
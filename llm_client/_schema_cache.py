@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""JSON Schema 缓存 - 同一 schema 只序列化、编译一次"""
+
+import functools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from . import _json
+
+# fastjsonschema 可选：未安装时不提供编译后的校验函数
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+# 缓存的 schema 数量上限
+_SCHEMA_CACHE_SIZE = 256
+
+# id(schema) -> (schema, 序列化后的 JSON 字符串)
+_schema_json_cache: "OrderedDict[int, Tuple[Any, str]]" = OrderedDict()
+_schema_json_lock = threading.Lock()
+
+# id(frozen) -> (frozen, JSON 片段)，frozen 为 freeze_schema 由 dict 序列化得到的 FrozenSchema
+_fragment_cache: "OrderedDict[int, Tuple[Any, Any]]" = OrderedDict()
+
+# id(schema) -> (schema, 编译后的校验函数)
+_schema_validator_cache: "OrderedDict[int, Tuple[Any, Callable[[Any], Any]]]" = OrderedDict()
+
+
+class FrozenSchema(str):
+    """freeze_schema 由 dict 序列化得到的 JSON 文本，确定是合法 JSON，可作为片段原样嵌入请求体"""
+
+    __slots__ = ()
+
+
+def freeze_schema(schema: Union[Dict[str, Any], str]) -> str:
+    """
+    将 JSON Schema 序列化为紧凑的 JSON 字符串并缓存
+
+    缓存按对象身份（id）索引，条目同时持有 schema 引用，避免 id 被复用。
+    schema 被视为不可变：序列化后再原地修改 schema 不会反映到缓存结果中。
+    vLLM 的 structured_outputs.json 同时接受 dict 和 JSON 字符串，
+    传入字符串后 SDK 不再逐层遍历嵌套 dict。
+    dict 的序列化结果为 FrozenSchema（str 子类）；调用方传入的字符串原样返回，
+    其内容未经校验，只会作为普通 JSON 字符串发送。
+
+    Args:
+        schema: JSON Schema dict，或已经序列化的 JSON 字符串
+
+    Returns:
+        JSON 字符串（相同 schema 对象返回同一个 FrozenSchema 对象）
+
+    Example:
+        >>> schema = {"type": "object", "properties": {"name": {"type": "string"}}}
+        >>> freeze_schema(schema)
+        '{"type":"object","properties":{"name":{"type":"string"}}}'
+        >>> freeze_schema(schema) is freeze_schema(schema)
+        True
+    """
+    if isinstance(schema, str):
+        return schema
+
+    key = id(schema)
+    with _schema_json_lock:
+        entry = _schema_json_cache.get(key)
+        if entry is not None and entry[0] is schema:
+            _schema_json_cache.move_to_end(key)
+            return entry[1]
+
+    frozen = FrozenSchema(_json.dumps(schema))
+
+    with _schema_json_lock:
+        _schema_json_cache[key] = (schema, frozen)
+        _schema_json_cache.move_to_end(key)
+        if len(_schema_json_cache) > _SCHEMA_CACHE_SIZE:
+            _schema_json_cache.popitem(last=False)
+
+    return frozen
+
+
+def _cached_fragment(obj: Any, encode: Callable[[Any], Any]) -> Any:
+    """按对象身份缓存 encode(obj) 的结果，条目同时持有 obj 引用，避免 id 被复用"""
+    key = id(obj)
+    with _schema_json_lock:
+        entry = _fragment_cache.get(key)
+        if entry is not None and entry[0] is obj:
+            _fragment_cache.move_to_end(key)
+            return entry[1]
+
+    encoded = encode(obj)
+
+    with _schema_json_lock:
+        _fragment_cache[key] = (obj, encoded)
+        _fragment_cache.move_to_end(key)
+        if len(_fragment_cache) > _SCHEMA_CACHE_SIZE:
+            _fragment_cache.popitem(last=False)
+
+    return encoded
+
+
+def schema_fragment(frozen: FrozenSchema) -> Any:
+    """
+    将 freeze_schema 由 dict 序列化得到的结果包装为 JSON 片段并缓存
+
+    请求体中以 JSON 对象（而不是转义后的 JSON 字符串）原样嵌入已序列化的 schema，
+    每次请求既不重新编码 schema，也不对整段文本做字符串转义。
+    片段只能由 orjson 序列化，调用方需先确认 _json.HAS_FRAGMENT。
+    调用方传入的普通字符串不保证是合法 JSON，不能包装为片段。
+
+    Args:
+        frozen: freeze_schema 返回的 FrozenSchema
+
+    Returns:
+        orjson.Fragment（相同字符串对象返回同一个片段）
+    """
+    # orjson.Fragment 只接受精确的 str / bytes，先转回普通 str（每个 schema 只发生一次）
+    return _cached_fragment(frozen, lambda text: _json.raw_fragment(str(text)))
+
+
+@functools.lru_cache(maxsize=_SCHEMA_CACHE_SIZE)
+def _compile_validator(canonical: str) -> Callable[[Any], Any]:
+    """按规范化的 JSON 文本编译校验函数，内容相同的 schema 共用同一结果"""
+    return fastjsonschema.compile(_json.loads(canonical))
+
+
+def schema_validator(schema: Union[Dict[str, Any], str]) -> Optional[Callable[[Any], Any]]:
+    """
+    获取 JSON Schema 编译后的校验函数并缓存
+
+    先按对象身份（id）查找；未命中时按 sort_keys 规范化后的 JSON 文本查找，
+    每次请求重新构造的等价 schema 也只编译一次。
+
+    Args:
+        schema: JSON Schema dict，或 JSON 字符串
+
+    Returns:
+        校验函数（校验失败时抛出 fastjsonschema.JsonSchemaException），
+        未安装 fastjsonschema 时返回 None
+    """
+    if fastjsonschema is None:
+        return None
+
+    key = id(schema)
+    with _schema_json_lock:
+        entry = _schema_validator_cache.get(key)
+        if entry is not None and entry[0] is schema:
+            _schema_validator_cache.move_to_end(key)
+            return entry[1]
+
+    data = _json.loads(schema) if isinstance(schema, str) else schema
+    validator = _compile_validator(_json.dumps(data, sort_keys=True))
+
+    with _schema_json_lock:
+        _schema_validator_cache[key] = (schema, validator)
+        _schema_validator_cache.move_to_end(key)
+        if len(_schema_validator_cache) > _SCHEMA_CACHE_SIZE:
+            _schema_validator_cache.popitem(last=False)
+
+    return validator
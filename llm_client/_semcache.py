@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""语义缓存模块 - 基于 embedding 余弦相似度复用历史响应"""
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, List, Sequence
+
+from ._cache import MISS
+
+# numpy 可选：安装时用矩阵乘法批量计算相似度，否则退回纯 Python
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _normalize(vector: Sequence[float]) -> List[float]:
+    """L2 归一化，归一化后内积即余弦相似度"""
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0.0:
+        return list(vector)
+    return [x / norm for x in vector]
+
+
+class _Bucket:
+    """同一命名空间下的缓存条目"""
+
+    __slots__ = ("vectors", "values", "matrix")
+
+    def __init__(self):
+        self.vectors: List[List[float]] = []
+        self.values: List[Any] = []
+        self.matrix = None  # numpy 矩阵缓存，插入后失效
+
+
+class SemanticCache:
+    """
+    语义缓存
+
+    按命名空间（模型 + 上下文 + 调用选项）存储 (归一化向量, 响应) 对，
+    查询时返回相似度不低于 threshold 的最相近条目。
+    命名空间保证只有上下文完全一致、仅最后一条用户消息措辞不同的请求才会互相命中。
+
+    Attributes:
+        threshold: 命中所需的最小余弦相似度
+        maxsize: 所有命名空间合计的最大条目数
+
+    Example:
+        >>> cache = SemanticCache(threshold=0.95)
+        >>> cache.add(namespace, embedding, "response")
+        >>> cache.lookup(namespace, similar_embedding)
+        'response'
+    """
+
+    def __init__(self, threshold: float = 0.95, maxsize: int = 1024):
+        """
+        初始化语义缓存
+
+        Args:
+            threshold: 命中所需的最小余弦相似度
+            maxsize: 所有命名空间合计的最大条目数
+        """
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[bytes, _Bucket]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, namespace: bytes, vector: Sequence[float]) -> Any:
+        """
+        查找最相近的缓存响应
+
+        Args:
+            namespace: 命名空间键
+            vector: 查询 embedding
+
+        Returns:
+            命中的缓存值，未命中时返回 MISS
+        """
+        query = _normalize(vector)
+        with self._lock:
+            bucket = self._buckets.get(namespace)
+            if bucket is None or not bucket.values:
+                return MISS
+            self._buckets.move_to_end(namespace)
+
+            if np is not None:
+                if bucket.matrix is None:
+                    bucket.matrix = np.asarray(bucket.vectors, dtype=np.float32)
+                scores = bucket.matrix @ np.asarray(query, dtype=np.float32)
+                best = int(scores.argmax())
+                best_score = float(scores[best])
+            else:
+                best, best_score = -1, -1.0
+                for i, cached in enumerate(bucket.vectors):
+                    score = sum(a * b for a, b in zip(cached, query))
+                    if score > best_score:
+                        best, best_score = i, score
+
+            if best_score >= self.threshold:
+                return bucket.values[best]
+            return MISS
+
+    def add(self, namespace: bytes, vector: Sequence[float], value: Any) -> None:
+        """
+        写入缓存条目，超过 maxsize 时淘汰最久未使用命名空间中的最早条目
+
+        Args:
+            namespace: 命名空间键
+            vector: 请求 embedding
+            value: 响应
+        """
+        normalized = _normalize(vector)
+        with self._lock:
+            bucket = self._buckets.get(namespace)
+            if bucket is None:
+                bucket = self._buckets[namespace] = _Bucket()
+            self._buckets.move_to_end(namespace)
+            bucket.vectors.append(normalized)
+            bucket.values.append(value)
+            bucket.matrix = None
+            self._size += 1
+
+            while self._size > self.maxsize:
+                oldest_key, oldest = next(iter(self._buckets.items()))
+                oldest.vectors.pop(0)
+                oldest.values.pop(0)
+                oldest.matrix = None
+                self._size -= 1
+                if not oldest.values:
+                    del self._buckets[oldest_key]
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._buckets.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
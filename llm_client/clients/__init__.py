@@ -3,5 +3,6 @@
 
 from .base_client import BaseLLMClient
 from .openai_client import OpenAIClient
+from .registry import ClientRegistry
 
-__all__ = ["BaseLLMClient", "OpenAIClient"]
\ No newline at end of file
+__all__ = ["BaseLLMClient", "OpenAIClient", "ClientRegistry"]
\ No newline at end of file
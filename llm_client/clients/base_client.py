@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """LLM 客户端抽象基类 - 定义统一的客户端接口"""
 
+import asyncio
+import functools
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional, Union, Iterator
 
@@ -21,6 +23,9 @@ class BaseLLMClient(ABC):
         ...         return response_stream if stream else response_text
     """
 
+    # 子类可声明 __slots__ 以避免实例 __dict__
+    __slots__ = ()
+
     @abstractmethod
     def chat(
         self,
@@ -55,6 +60,56 @@ class BaseLLMClient(ABC):
         """
         pass
 
+    async def achat(
+        self,
+        messages: List[Dict[str, Any]],
+        model_name: str,
+        stream: bool = False,
+        enable_thinking: bool = False,
+        clear_thinking: bool = True,
+        tools: Optional[List[ToolDefinition]] = None,
+        json_schema: Optional[JSONSchema] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Any:
+        """
+        异步调用 LLM 进行对话
+
+        默认实现在线程池中执行同步的 chat()，子类可覆盖为原生异步实现。
+        参数与返回值同 chat()。
+
+        Raises:
+            ClientError: 当调用失败时
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(
+                self.chat,
+                messages=messages,
+                model_name=model_name,
+                stream=stream,
+                enable_thinking=enable_thinking,
+                clear_thinking=clear_thinking,
+                tools=tools,
+                json_schema=json_schema,
+                max_tokens=max_tokens,
+            ),
+        )
+
+    def warmup(self, connections: int = 1) -> int:
+        """
+        预先建立到服务端的连接（TCP/TLS 握手），使首次真实调用不承担握手耗时
+
+        默认实现不做任何事，使用连接池的子类可覆盖。
+
+        Args:
+            connections: 希望预先建立的连接数
+
+        Returns:
+            成功建立的连接数
+        """
+        return 0
+
     @abstractmethod
     def get_model_name(self) -> str:
         """
@@ -83,9 +138,37 @@ class BaseLLMClient(ABC):
             dimensions: Matryoshka Embeddings 维度（支持 Matryoshka 的模型使用）
 
         Returns:
-            embedding 向量或向量列表
+            字符串 / 单个图文结构输入返回单个向量；列表输入返回向量列表（单元素列表同样返回 [[...]]）
+
+        Raises:
+            ClientError: 当调用失败时
+        """
+        pass
+
+    async def aembed(
+        self,
+        input_data: Union[str, List[str], Dict[str, Any], List[Dict[str, Any]]],
+        model_name: str,
+        extra_body: Optional[Dict[str, Any]] = None,
+        dimensions: Optional[int] = None,
+    ) -> Union[List[float], List[List[float]]]:
+        """
+        异步 Embedding 调用
+
+        默认实现在线程池中执行同步的 embed()，子类可覆盖为原生异步实现。
+        参数与返回值同 embed()。
 
         Raises:
             ClientError: 当调用失败时
         """
-        pass
\ No newline at end of file
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(
+                self.embed,
+                input_data,
+                model_name,
+                extra_body=extra_body,
+                dimensions=dimensions,
+            ),
+        )
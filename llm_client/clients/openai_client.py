@@ -1,19 +1,123 @@
 # -*- coding: utf-8 -*-
 """OpenAI 客户端实现 - 基于 OpenAI SDK 和 ModelAdapter"""
 
-from typing import List, Dict, Any, Optional, Union, Iterator, TYPE_CHECKING
-
-from openai import OpenAI
+import array
+import asyncio
+import concurrent.futures
+import io
+import logging
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Union, Iterator, AsyncIterator, Literal
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
 
 from .base_client import BaseLLMClient
 from ..types import ToolDefinition, JSONSchema, ClientError
 from ..config import get_adapter_for_model
-
-if TYPE_CHECKING:
-    import logging
+from .._schema_cache import FrozenSchema, freeze_schema, schema_fragment
+from .. import _json
 
 logger = None  # 将在初始化时注入
 
+# 未注入 logger 时使用的默认 logger
+_default_logger = logging.getLogger(__name__)
+
+# HTTP/2 依赖可选的 h2 包（pip install "httpx[http2]"），缺失时退回 HTTP/1.1 keep-alive
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# pybase64 可选（SIMD 实现，接口与标准库一致），大图编码明显更快
+try:
+    import pybase64 as _b64
+except ImportError:
+    import base64 as _b64
+
+# PIL 可选：仅用于编码 PIL.Image 输入，模块导入时解析一次
+try:
+    from PIL import Image as _PIL_Image
+except ImportError:
+    _PIL_Image = None
+
+# 共享连接池配置
+_POOL_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=128, keepalive_expiry=60)
+_POOL_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+
+
+def _sniff_image_mime(header: bytes) -> str:
+    """按文件头魔数识别图片类型，无法识别时返回 application/octet-stream"""
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"GIF8"):
+        return "image/gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def _embed_fragments(body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    把请求体 structured_outputs 中预序列化的 schema 替换为缓存的 JSON 片段（浅拷贝，不修改原字典）
+
+    只处理 freeze_schema 由 dict 序列化得到的 FrozenSchema；调用方直接传入的 JSON 字符串
+    内容未经校验，仍作为普通字符串转义发送。
+    """
+    structured = body.get("structured_outputs")
+    schema = structured.get("json") if type(structured) is dict else None
+    if type(schema) is not FrozenSchema:
+        return body
+    return {**body, "structured_outputs": {**structured, "json": schema_fragment(schema)}}
+
+
+class _FastJSONRequestMixin:
+    """
+    请求体 JSON 序列化改用 orjson
+
+    OpenAI SDK 把请求体以 json= 参数交给 httpx，由标准库 json 编码；
+    长消息和大批量 embedding 请求中这部分 CPU 开销明显。未安装 orjson
+    或对象无法由 orjson 序列化时，退回 httpx 的默认编码。
+    orjson 支持 Fragment 时，structured_outputs 中由 dict 预序列化的 schema 使用缓存的 JSON 片段
+    原样嵌入，不必每次请求重新编码。
+    """
+
+    def build_request(self, method, url, *, content=None, json=None, headers=None, **kwargs):
+        if json is not None and content is None and _json.HAS_ORJSON:
+            body = json
+            if _json.HAS_FRAGMENT and isinstance(json, dict):
+                body = _embed_fragments(json)
+            try:
+                content = _json.dumps_bytes(body)
+            except TypeError:
+                pass
+            else:
+                json = None
+                headers = httpx.Headers(headers)
+                headers.setdefault("Content-Type", "application/json")
+        return super().build_request(method, url, content=content, json=json, headers=headers, **kwargs)
+
+
+class _FastJSONClient(_FastJSONRequestMixin, httpx.Client):
+    """请求体使用 orjson 序列化的 httpx.Client"""
+
+
+class _FastJSONAsyncClient(_FastJSONRequestMixin, httpx.AsyncClient):
+    """请求体使用 orjson 序列化的 httpx.AsyncClient"""
+
+
+# 每个客户端缓存的请求参数模板数量上限
+_PARAMS_CACHE_SIZE = 128
+
+# PIL 图片编码为 JPEG 时的质量
+_JPEG_QUALITY = 85
+
 
 class OpenAIClient(BaseLLMClient):
     """
@@ -22,9 +126,12 @@ class OpenAIClient(BaseLLMClient):
     使用 OpenAI SDK 进行 API 调用，通过 ModelAdapter 获取模型特定的参数。
 
     Attributes:
-        client: OpenAI 客户端实例
+        client: OpenAI 客户端实例（同一 api_key 和 base_url 的实例间共享）
+        base_url: API 基础 URL
         model_name: 模型名称
         label: 日志标识符
+        image_format: PIL 图片上传前的编码格式（"png" 或 "jpeg"）
+        embedding_format: embedding 向量的返回类型（"list" 或 "array"）
         logger: 注入的 logger 实例
 
     Example:
@@ -34,7 +141,41 @@ class OpenAIClient(BaseLLMClient):
         ...     print(chunk.choices[0].delta.content, end="")
     """
 
-    def __init__(self, api_key: str, base_url: str, model_name: str, label: str, logger=None):
+    __slots__ = (
+        "client", "base_url", "model_name", "label", "adapter", "image_format", "embedding_format", "logger",
+        "_params_cache", "_params_cache_lock", "_async_http_client", "_async_sdk",
+        "_http_client",
+    )
+
+    # base_url 到共享 httpx.Client 的映射，所有实例共用同一连接池
+    _http_clients: Dict[str, httpx.Client] = {}
+    _http_clients_lock = threading.Lock()
+
+    # (api_key, base_url) 到共享 OpenAI SDK 实例的映射，同一端点的多个模型复用同一个 SDK
+    _sdk_clients: Dict[Tuple[str, str], OpenAI] = {}
+
+    # 事件循环到 {base_url: httpx.AsyncClient} / {(api_key, base_url): AsyncOpenAI} 的映射；
+    # 异步连接绑定创建它的事件循环，因此按循环隔离，循环被回收后对应条目自动释放
+    _async_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+        weakref.WeakKeyDictionary()
+    )
+    _async_sdk_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], AsyncOpenAI]]" = (
+        weakref.WeakKeyDictionary()
+    )
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model_name: str = "",
+        label: str = "",
+        logger=None,
+        http_client: Optional[httpx.Client] = None,
+        image_format: Literal["png", "jpeg"] = "png",
+        sdk: Optional[OpenAI] = None,
+        embedding_format: Literal["list", "array"] = "list",
+        async_http_client: Optional[httpx.AsyncClient] = None,
+    ):
         """
         初始化 OpenAI 客户端
 
@@ -44,18 +185,50 @@ class OpenAIClient(BaseLLMClient):
             model_name: 模型名称
             label: 日志标识符
             logger: 可选的 logger 实例，默认使用标准 logging
+            http_client: 可选的 httpx.Client，不传时使用按 base_url 共享的默认连接池；
+                只用于同步调用，异步调用（achat / aembed）不使用它
+            image_format: PIL 图片上传前的编码格式。"png" 无损（默认）；
+                "jpeg" 编码更快、体积更小，但有损且会丢弃透明通道
+            sdk: 可选的共享 OpenAI SDK 实例，传入时忽略 api_key，base_url 默认取自 sdk；
+                同时传入的 http_client 应为该 sdk 使用的连接池，只用于 warmup()
+            embedding_format: embedding 向量的返回类型。"list" 返回 list[float]（默认）；
+                "array" 以 base64 传输并直接解码为 array.array("f")，每个元素 4 字节
+                （list 中每个 float 约 32 字节），支持索引、迭代和 len()，
+                但与 list 比较不相等，也不能直接 json.dumps
+            async_http_client: 可选的 httpx.AsyncClient，异步调用使用它（由调用方负责关闭，
+                且只能在创建它的事件循环中使用）；不传时使用按事件循环和 base_url 共享的默认连接池
+
+        Raises:
+            ValueError: 既未传入 sdk，也未传入 api_key 和 base_url 时
         """
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        if sdk is not None:
+            self.client = sdk
+            base_url = base_url or str(sdk.base_url)
+        elif api_key is None or base_url is None:
+            raise ValueError("OpenAIClient requires either sdk or both api_key and base_url")
+        elif http_client is not None:
+            # 调用方自行管理连接池（及其生命周期），不进入共享 SDK 缓存
+            self.client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+        else:
+            self.client = self._get_sdk_client(api_key, base_url)
+            http_client = self._http_clients.get(base_url)
+        # 同步调用使用的连接池（供 warmup 预先建立连接），只传入 sdk 时未知
+        self._http_client = http_client
+        self.base_url = base_url
         self.model_name = model_name
         self.label = label
         self.adapter = get_adapter_for_model(model_name)
+        self.image_format = image_format
+        self.embedding_format = embedding_format
+        self._async_http_client = async_http_client
+        self._async_sdk: Optional[AsyncOpenAI] = None
 
-        # 注入或创建 logger
-        if logger is not None:
-            self.logger = logger
-        else:
-            import logging
-            self.logger = logging.getLogger(__name__)
+        # 请求参数模板缓存：选项签名 -> 模板
+        self._params_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._params_cache_lock = threading.Lock()
+
+        # 注入 logger，未注入时使用模块级默认 logger
+        self.logger = logger if logger is not None else _default_logger
 
     def chat(
         self,
@@ -89,23 +262,18 @@ class OpenAIClient(BaseLLMClient):
             ClientError: 当调用失败时
         """
         try:
-            # 获取基础参数
-            base_params = self.adapter.get_base_params(messages, model_name, stream)
-
-            # 获取模型特定参数
-            model_params = self.adapter.get_model_specific_params(
-                enable_thinking=enable_thinking,
-                clear_thinking=clear_thinking,
-                stream=stream,
-                tools=tools,
-                json_schema=json_schema,
-                max_tokens=max_tokens,
+            # 相同选项签名复用缓存的参数模板，只填入 messages 和 tools
+            template = self._params_template(
+                model_name, stream, enable_thinking, clear_thinking, tools, json_schema, max_tokens
             )
+            request_params = {**template, "messages": messages}
+            if tools is not None:
+                request_params["tools"] = tools
 
-            # 合并参数
-            request_params = {**base_params, **model_params}
-
-            self.logger.debug(f"Calling LLM [{self.label}]: model={model_name}, stream={stream}, thinking={enable_thinking}")
+            self.logger.debug(
+                "Calling LLM [%s]: model=%s, stream=%s, thinking=%s",
+                self.label, model_name, stream, enable_thinking,
+            )
 
             # 调用 API
             response = self.client.chat.completions.create(**request_params)
@@ -118,9 +286,333 @@ class OpenAIClient(BaseLLMClient):
                 return content
 
         except Exception as e:
-            self.logger.error(f"LLM client error [{self.label}]: {str(e)}", exc_info=True)
+            self.logger.error(
+                "LLM client error [%s]: %s", self.label, e,
+                exc_info=self.logger.isEnabledFor(logging.DEBUG),
+            )
+            raise ClientError(f"LLM API error: {str(e)}") from e
+
+    async def achat(
+        self,
+        messages: List[Dict[str, Any]],
+        model_name: str,
+        stream: bool = False,
+        enable_thinking: bool = False,
+        clear_thinking: bool = True,
+        tools: Optional[List[ToolDefinition]] = None,
+        json_schema: Optional[JSONSchema] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Union[str, AsyncIterator]:
+        """
+        异步调用 LLM 进行对话
+
+        基于 AsyncOpenAI，单个事件循环即可承载大量并发请求，无需线程池。
+
+        Args:
+            messages: 聊天消息列表
+            model_name: 模型名称
+            stream: 是否流式输出
+            enable_thinking: 是否开启思考模式
+            clear_thinking: 是否清空之前的思考
+            tools: 工具定义列表
+            json_schema: JSON Schema 定义（用于 vLLM 结构化输出）
+            max_tokens: 最大 token 数
+
+        Returns:
+            如果 stream=True，返回原始异步流迭代器
+            如果 stream=False，返回生成的文本字符串
+
+        Raises:
+            ClientError: 当调用失败时
+        """
+        try:
+            template = self._params_template(
+                model_name, stream, enable_thinking, clear_thinking, tools, json_schema, max_tokens
+            )
+            request_params = {**template, "messages": messages}
+            if tools is not None:
+                request_params["tools"] = tools
+
+            self.logger.debug(
+                "Calling LLM async [%s]: model=%s, stream=%s, thinking=%s",
+                self.label, model_name, stream, enable_thinking,
+            )
+
+            response = await self._get_async_client().chat.completions.create(**request_params)
+
+            if stream:
+                return response
+            else:
+                content = response.choices[0].message.content or ""
+                return content
+
+        except Exception as e:
+            self.logger.error(
+                "LLM async client error [%s]: %s", self.label, e,
+                exc_info=self.logger.isEnabledFor(logging.DEBUG),
+            )
             raise ClientError(f"LLM API error: {str(e)}") from e
 
+    def _get_async_client(self) -> AsyncOpenAI:
+        """
+        获取当前事件循环中与本客户端端点对应的共享 AsyncOpenAI 实例
+
+        传入了 async_http_client 时使用基于它的专属实例。
+
+        Returns:
+            AsyncOpenAI 实例，与同步客户端使用相同的 api_key 和 base_url
+        """
+        if self._async_http_client is not None:
+            if self._async_sdk is None:
+                self._async_sdk = AsyncOpenAI(
+                    api_key=self.client.api_key,
+                    base_url=self.base_url,
+                    http_client=self._async_http_client,
+                )
+            return self._async_sdk
+
+        loop = asyncio.get_running_loop()
+        key = (self.client.api_key, self.base_url)
+        with self._http_clients_lock:
+            loop_sdks = self._async_sdk_clients.setdefault(loop, {})
+            async_client = loop_sdks.get(key)
+        if async_client is None:
+            async_client = AsyncOpenAI(
+                api_key=key[0],
+                base_url=key[1],
+                http_client=self._get_async_http_client(loop, key[1]),
+            )
+            with self._http_clients_lock:
+                async_client = loop_sdks.setdefault(key, async_client)
+        return async_client
+
+    @classmethod
+    async def aclose_shared_async_pools(cls) -> None:
+        """
+        关闭当前事件循环中共享的默认异步连接池
+
+        异步连接池绑定创建它的事件循环，每次 asyncio.run() 都会创建一组新的连接池；
+        在循环结束前调用本方法立即释放连接，否则要等循环被回收后才由垃圾回收关闭。
+        关闭后同一循环中的下一次异步调用会重新创建连接池；调用方传入的 async_http_client 不受影响。
+        默认连接池由同一循环中的所有客户端和 LLMHandler 共用，应在该循环中的异步调用全部结束后调用。
+
+        Example:
+            >>> async def main():
+            ...     results = await handler.abatch_llm(messages_list)
+            ...     await OpenAIClient.aclose_shared_async_pools()
+            ...     return results
+            >>> results = asyncio.run(main())
+        """
+        loop = asyncio.get_running_loop()
+        with cls._http_clients_lock:
+            cls._async_sdk_clients.pop(loop, None)
+            http_clients = cls._async_http_clients.pop(loop, {})
+        for http_client in http_clients.values():
+            await http_client.aclose()
+
+    @classmethod
+    def _get_sdk_client(cls, api_key: str, base_url: str) -> OpenAI:
+        """
+        获取 (api_key, base_url) 对应的共享 OpenAI SDK 实例
+
+        同一网关服务多个模型时，各 OpenAIClient 共用一个 SDK 实例及其连接池。
+
+        Args:
+            api_key: API 密钥
+            base_url: API 基础 URL
+
+        Returns:
+            共享的 OpenAI 实例
+        """
+        key = (api_key, base_url)
+        with cls._http_clients_lock:
+            sdk = cls._sdk_clients.get(key)
+        if sdk is None:
+            sdk = OpenAI(api_key=api_key, base_url=base_url, http_client=cls._get_http_client(base_url))
+            with cls._http_clients_lock:
+                sdk = cls._sdk_clients.setdefault(key, sdk)
+        return sdk
+
+    @classmethod
+    def _get_async_http_client(cls, loop: asyncio.AbstractEventLoop, base_url: str) -> httpx.AsyncClient:
+        """
+        获取事件循环与 base_url 对应的共享 httpx.AsyncClient
+
+        Args:
+            loop: 当前运行的事件循环
+            base_url: API 基础 URL
+
+        Returns:
+            共享的 httpx.AsyncClient 实例
+        """
+        with cls._http_clients_lock:
+            loop_clients = cls._async_http_clients.setdefault(loop, {})
+            http_client = loop_clients.get(base_url)
+            if http_client is None:
+                http_client = _FastJSONAsyncClient(
+                    http2=_HTTP2_AVAILABLE,
+                    limits=_POOL_LIMITS,
+                    timeout=_POOL_TIMEOUT,
+                    follow_redirects=True,
+                )
+                loop_clients[base_url] = http_client
+            return http_client
+
+    def _params_template(
+        self,
+        model_name: str,
+        stream: bool,
+        enable_thinking: bool,
+        clear_thinking: bool,
+        tools: Optional[List[ToolDefinition]],
+        json_schema: Optional[JSONSchema],
+        max_tokens: Optional[int],
+    ) -> Dict[str, Any]:
+        """
+        获取不含 messages 和 tools 的请求参数模板
+
+        缓存键按内容区分：json_schema 取 freeze_schema 序列化后的 JSON 文本，每次调用新构造的
+        等价 schema 同样命中；tools 只区分是否传入，调用方在每次调用时填入自己的列表
+        （适配器原样透传 tools），原地修改工具列表会反映到下一次请求。
+        freeze_schema 按对象身份缓存序列化结果，schema 传入后不应再原地修改，
+        否则同一对象仍按旧内容发送；需要变更时请传入新的 dict。
+
+        Args:
+            model_name: 模型名称
+            stream: 是否流式输出
+            enable_thinking: 是否开启思考模式
+            clear_thinking: 是否清空之前的思考
+            tools: 工具定义列表
+            json_schema: JSON Schema 定义
+            max_tokens: 最大 token 数
+
+        Returns:
+            请求参数模板（只读，调用方需复制后再添加 messages 和 tools）
+        """
+        frozen = freeze_schema(json_schema) if json_schema is not None else None
+        key = (model_name, stream, enable_thinking, clear_thinking, tools is not None, frozen, max_tokens)
+
+        with self._params_cache_lock:
+            template = self._params_cache.get(key)
+            if template is not None:
+                self._params_cache.move_to_end(key)
+                return template
+
+        # 构建完整参数（json_schema 以预序列化的 JSON 字符串传递），messages 在每次调用时单独填充
+        template = self.adapter.build_request_params(
+            messages=[],
+            model_name=model_name,
+            stream=stream,
+            enable_thinking=enable_thinking,
+            clear_thinking=clear_thinking,
+            tools=tools,
+            json_schema=frozen,
+            max_tokens=max_tokens,
+        )
+        template.pop("messages", None)
+        template.pop("tools", None)
+
+        with self._params_cache_lock:
+            self._params_cache[key] = template
+            if len(self._params_cache) > _PARAMS_CACHE_SIZE:
+                self._params_cache.popitem(last=False)
+
+        return template
+
+    @staticmethod
+    def build_http_client(
+        max_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+    ) -> httpx.Client:
+        """
+        创建与默认连接池配置一致的 httpx.Client，可覆盖连接数和 keep-alive 时长
+
+        安装 orjson 时请求体使用 orjson 序列化。
+
+        Args:
+            max_connections: 最大连接数（keep-alive 连接数取其一半），None 使用默认值
+            keepalive_expiry: 空闲连接保持时间（秒），None 使用默认值
+
+        Returns:
+            新的 httpx.Client 实例，由调用方负责 close()
+
+        Example:
+            >>> http_client = OpenAIClient.build_http_client(max_connections=256, keepalive_expiry=90)
+            >>> client = OpenAIClient(api_key="xxx", base_url="http://...", model_name="GLM-4.7",
+            ...                       label="main", http_client=http_client)
+        """
+        limits = _POOL_LIMITS
+        if max_connections is not None or keepalive_expiry is not None:
+            limits = httpx.Limits(
+                max_connections=max_connections or _POOL_LIMITS.max_connections,
+                max_keepalive_connections=(
+                    max(1, max_connections // 2) if max_connections else _POOL_LIMITS.max_keepalive_connections
+                ),
+                keepalive_expiry=keepalive_expiry if keepalive_expiry is not None else _POOL_LIMITS.keepalive_expiry,
+            )
+        return _FastJSONClient(
+            http2=_HTTP2_AVAILABLE,
+            limits=limits,
+            timeout=_POOL_TIMEOUT,
+            follow_redirects=True,
+        )
+
+    @classmethod
+    def _get_http_client(cls, base_url: str) -> httpx.Client:
+        """
+        获取 base_url 对应的共享 httpx.Client
+
+        同一 base_url 的所有客户端复用同一个 keep-alive 连接池，避免重复 TCP/TLS 握手；
+        安装 h2 时启用 HTTP/2，使 batch_llm 的并发请求复用单条连接。
+
+        Args:
+            base_url: API 基础 URL
+
+        Returns:
+            共享的 httpx.Client 实例
+        """
+        with cls._http_clients_lock:
+            http_client = cls._http_clients.get(base_url)
+            if http_client is None:
+                http_client = cls._http_clients[base_url] = cls.build_http_client()
+            return http_client
+
+    def warmup(self, connections: int = 1) -> int:
+        """
+        并发向 base_url 发送 HEAD 请求，预先建立 keep-alive 连接
+
+        请求经由同步调用使用的同一 httpx 连接池发出，握手完成的连接留在池中供后续调用复用。
+        服务端对 HEAD 返回的状态码（包括 404）不影响结果，只有网络错误才算失败。
+        只传入 sdk 而未同时传入其连接池时无法预热，记录警告并返回 0。
+
+        Args:
+            connections: 希望预先建立的连接数（HTTP/2 下同一主机只需一条）
+
+        Returns:
+            成功完成的请求数
+        """
+        http_client = self._http_client
+        if connections < 1:
+            return 0
+        if http_client is None:
+            self.logger.warning(
+                "[%s] Warmup skipped: no shared connection pool known for this client", self.label
+            )
+            return 0
+
+        def head() -> bool:
+            try:
+                http_client.head(self.base_url)
+                return True
+            except httpx.HTTPError as e:
+                self.logger.debug("[%s] Warmup request failed: %s", self.label, e)
+                return False
+
+        if connections == 1:
+            return int(head())
+        with concurrent.futures.ThreadPoolExecutor(max_workers=connections) as executor:
+            return sum(executor.map(lambda _: head(), range(connections)))
+
     def get_model_name(self) -> str:
         """获取客户端使用的模型名称"""
         return self.model_name
@@ -135,6 +627,8 @@ class OpenAIClient(BaseLLMClient):
         """
         实现 embedding 调用，处理图片编码和 Matryoshka 维度
 
+        列表输入会作为单个请求的 input 数组整体发送，由服务端（如 vLLM 连续批处理）统一计算。
+
         Args:
             input_data: 输入数据（文本字符串、文本列表、或图文混合结构）
             model_name: 模型名称
@@ -142,45 +636,140 @@ class OpenAIClient(BaseLLMClient):
             dimensions: Matryoshka Embeddings 维度（支持 Matryoshka 的模型使用）
 
         Returns:
-            embedding 向量或向量列表
+            字符串 / 单个图文结构输入返回单个向量；列表输入返回向量列表（单元素列表同样返回 [[...]]）
 
         Raises:
             ClientError: 当调用失败时
         """
         try:
-            # 处理 extra_body 中的 PIL 图片和 OpenAIMessageBlock 格式的图片
-            processed_extra = self._process_images_in_extra_body(extra_body) if extra_body else None
+            request_params = self._embed_request_params(input_data, model_name, extra_body, dimensions)
+
+            self.logger.debug(
+                "Calling embedding API [%s]: model=%s, dimensions=%s",
+                self.label, model_name, dimensions,
+            )
 
-            # 添加 Matryoshka dimensions 参数
-            if dimensions is not None:
-                if processed_extra is None:
-                    processed_extra = {}
-                processed_extra["dimensions"] = dimensions
+            response = self.client.embeddings.create(**request_params)
 
-            # 调用 API
-            request_params = {"model": model_name, "input": input_data}
-            if processed_extra:
-                request_params["extra_body"] = processed_extra
+            # 返回结果（单输入返回 list[float]，列表输入返回 list[list[float]]，即使列表只有一个元素）
+            if self.embedding_format == "array":
+                vectors = [self._decode_vector(item.embedding) for item in response.data]
+            else:
+                vectors = [item.embedding for item in response.data]
+            if isinstance(input_data, list):
+                return vectors
+            return vectors[0]
 
-            self.logger.debug(f"Calling embedding API [{self.label}]: model={model_name}, dimensions={dimensions}")
+        except Exception as e:
+            self.logger.error(
+                "Embedding client error [%s]: %s", self.label, e,
+                exc_info=self.logger.isEnabledFor(logging.DEBUG),
+            )
+            raise ClientError(f"Embedding API error: {str(e)}") from e
 
-            response = self.client.embeddings.create(**request_params)
+    async def aembed(
+        self,
+        input_data: Union[str, List[str], Dict[str, Any], List[Dict[str, Any]]],
+        model_name: str,
+        extra_body: Optional[Dict[str, Any]] = None,
+        dimensions: Optional[int] = None,
+    ) -> Union[List[float], List[List[float]]]:
+        """
+        异步 embedding 调用，基于当前事件循环的共享 AsyncOpenAI 实例
 
-            # 返回结果（单输入返回 list[float]，批量输入返回 list[list[float]]）
-            if len(response.data) == 1:
-                return response.data[0].embedding
-            return [item.embedding for item in response.data]
+        参数与返回值同 embed()。图片编码（CPU 操作）仍在事件循环线程中同步执行。
+
+        Raises:
+            ClientError: 当调用失败时
+        """
+        try:
+            request_params = self._embed_request_params(input_data, model_name, extra_body, dimensions)
+
+            self.logger.debug(
+                "Calling embedding API async [%s]: model=%s, dimensions=%s",
+                self.label, model_name, dimensions,
+            )
+
+            response = await self._get_async_client().embeddings.create(**request_params)
+
+            if self.embedding_format == "array":
+                vectors = [self._decode_vector(item.embedding) for item in response.data]
+            else:
+                vectors = [item.embedding for item in response.data]
+            if isinstance(input_data, list):
+                return vectors
+            return vectors[0]
 
         except Exception as e:
-            self.logger.error(f"Embedding client error [{self.label}]: {str(e)}", exc_info=True)
+            self.logger.error(
+                "Embedding async client error [%s]: %s", self.label, e,
+                exc_info=self.logger.isEnabledFor(logging.DEBUG),
+            )
             raise ClientError(f"Embedding API error: {str(e)}") from e
 
+    def _embed_request_params(
+        self,
+        input_data: Union[str, List[str], Dict[str, Any], List[Dict[str, Any]]],
+        model_name: str,
+        extra_body: Optional[Dict[str, Any]],
+        dimensions: Optional[int],
+    ) -> Dict[str, Any]:
+        """
+        构建 embeddings.create 的请求参数
+
+        Args:
+            input_data: 输入数据
+            model_name: 模型名称
+            extra_body: 额外的 API 参数（用于传图片）
+            dimensions: Matryoshka Embeddings 维度
+
+        Returns:
+            请求参数字典
+        """
+        # 处理 extra_body 中的 PIL 图片和 OpenAIMessageBlock 格式的图片
+        processed_extra = self._process_images_in_extra_body(extra_body) if extra_body else None
+
+        # 添加 Matryoshka dimensions 参数
+        if dimensions is not None:
+            if processed_extra is None:
+                processed_extra = {}
+            processed_extra["dimensions"] = dimensions
+
+        request_params = {"model": model_name, "input": input_data}
+        if self.embedding_format == "array":
+            # 显式指定 base64 后 SDK 不再把向量转换为 list，由 _decode_vector 直接解码
+            request_params["encoding_format"] = "base64"
+        if processed_extra:
+            request_params["extra_body"] = processed_extra
+        return request_params
+
+    @staticmethod
+    def _decode_vector(data: Union[str, List[float]]) -> "array.array[float]":
+        """
+        将 embedding 解码为 array.array("f")
+
+        Args:
+            data: base64 编码的 little-endian float32 字节，或服务端忽略 encoding_format
+                时返回的浮点数列表
+
+        Returns:
+            float32 数组
+        """
+        if not isinstance(data, str):
+            return array.array("f", data)
+        vector = array.array("f")
+        vector.frombytes(_b64.b64decode(data))
+        if sys.byteorder == "big":
+            vector.byteswap()
+        return vector
+
     def _process_images_in_extra_body(self, extra_body: Dict[str, Any]) -> Dict[str, Any]:
         """
         处理 extra_body 中的图片，将 PIL/Image 和其他格式统一转为 base64
 
         支持的图片格式：
         - PIL.Image 对象
+        - 图片文件字节（bytes / bytearray / memoryview）
         - data:image/png;base64,... (已编码)
         - http://... 或 https://... URL 字符串
 
@@ -194,64 +783,59 @@ class OpenAIClient(BaseLLMClient):
         if not images:
             return extra_body
 
-        # 统一处理为列表
-        if not isinstance(images, list):
-            images = [images]
-
-        processed = []
-        for img in images:
-            processed.extend(self._encode_single_image(img))
+        # 单张图片（最常见）直接编码，列表由 _encode_single_image 递归展开
+        processed = self._encode_single_image(images)
 
-        return {**extra_body, "image": processed if len(processed) > 1 else processed[0]}
+        result = dict(extra_body)
+        result["image"] = processed if len(processed) > 1 else processed[0]
+        return result
 
     def _encode_single_image(self, image_input: Any) -> List[str]:
         """
         编码单个图片或图片列表
 
         Args:
-            image_input: PIL.Image、图片路径URL、base64 字符串，或它们的列表
+            image_input: PIL.Image、图片文件字节、图片 URL、base64 字符串，或它们的列表
 
         Returns:
             base64 图片 URL 列表
         """
-        import base64
-        import io
-
-        processed = []
-
         # 如果输入是列表，递归处理
         if isinstance(image_input, list):
+            processed = []
             for item in image_input:
                 processed.extend(self._encode_single_image(item))
             return processed
 
-        # 检查是否是 PIL Image
-        try:
-            # 使用不导入的方式检查，避免导入失败时中断
-            image_module = __import__("PIL", fromlist=["Image"])
-            if isinstance(image_input, image_module.Image.Image):
-                # PIL.Image 转为 base64（避免显示：直接读取 bytes）
-                buffered = io.BytesIO()
+        # PIL Image 转为 base64（PIL 不可用时跳过）
+        if _PIL_Image is not None and isinstance(image_input, _PIL_Image.Image):
+            buffered = io.BytesIO()
+            if self.image_format == "jpeg":
+                # JPEG 不支持透明通道和调色板模式
+                if image_input.mode not in ("RGB", "L"):
+                    image_input = image_input.convert("RGB")
+                image_input.save(buffered, format="JPEG", quality=_JPEG_QUALITY)
+                mime = "image/jpeg"
+            else:
                 image_input.save(buffered, format="PNG")
-                img_base64 = base64.b64encode(buffered.getvalue()).decode("utf-8")
-                return [f"data:image/png;base64,{img_base64}"]
-        except ImportError:
-            # PIL 不可用时跳过
-            pass
-        except (AttributeError, TypeError):
-            pass
+                mime = "image/png"
+            # getbuffer() 直接引用 BytesIO 内部缓冲区，省去 getvalue() 的整图拷贝
+            img_base64 = _b64.b64encode(buffered.getbuffer()).decode("ascii")
+            return [f"data:{mime};base64,{img_base64}"]
+
+        # 已编码的图片文件字节（如读取的 PNG/JPEG 文件），直接 base64 编码
+        if isinstance(image_input, (bytes, bytearray, memoryview)):
+            mime = _sniff_image_mime(bytes(image_input[:12]))
+            img_base64 = _b64.b64encode(image_input).decode("ascii")
+            return [f"data:{mime};base64,{img_base64}"]
 
         # 如果是字符串，检查格式
         if isinstance(image_input, str):
-            if image_input.startswith("data:image"):
-                # 已经是 base64 格式
-                return [image_input]
-            elif image_input.startswith(("http://", "https://")):
-                # URL 格式，直接返回（vLLM 可能支持）
+            # data URL（已是 base64 格式）或 http(s) URL（vLLM 可能支持）直接返回
+            if image_input.startswith(("data:image", "http://", "https://")):
                 return [image_input]
-            else:
-                # 假设是纯 base64 数据，添加前缀
-                return [f"data:image/png;base64,{image_input}"]
+            # 假设是纯 base64 数据，添加前缀
+            return [f"data:image/png;base64,{image_input}"]
 
         # 其他情况，直接返回
         return [image_input]
\ No newline at end of file
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""客户端注册表 - 按需创建客户端实例"""
+
+import threading
+from typing import Any, Callable, Dict, Iterator, Mapping
+
+from .base_client import BaseLLMClient
+
+
+class ClientRegistry(Mapping):
+    """
+    延迟创建客户端的只读映射
+
+    只保存模型配置，首次通过调用名称访问时才调用 factory 创建客户端，
+    之后复用同一实例。配置了很多模型但只使用其中少数时，可省去其余客户端的创建开销。
+    遍历键（keys / len / in）不会触发创建；遍历值（values / items）会创建全部客户端。
+
+    Attributes:
+        configs: 调用名称到模型配置的映射
+
+    Example:
+        >>> registry = ClientRegistry({"main": config}, factory=make_client)
+        >>> "main" in registry  # 不创建客户端
+        True
+        >>> client = registry["main"]  # 首次访问时创建
+    """
+
+    def __init__(
+        self,
+        configs: Dict[str, Dict[str, Any]],
+        factory: Callable[[Dict[str, Any]], BaseLLMClient],
+    ):
+        """
+        初始化注册表
+
+        Args:
+            configs: 调用名称到模型配置的映射
+            factory: 根据单个模型配置创建客户端的函数
+        """
+        self.configs = configs
+        self._factory = factory
+        self._clients: Dict[str, BaseLLMClient] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, call_name: str) -> BaseLLMClient:
+        client = self._clients.get(call_name)
+        if client is not None:
+            return client
+
+        config = self.configs[call_name]
+        with self._lock:
+            # 双重检查，避免并发首次访问时重复创建
+            client = self._clients.get(call_name)
+            if client is None:
+                client = self._clients[call_name] = self._factory(config)
+        return client
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.configs)
+
+    def __len__(self) -> int:
+        return len(self.configs)
+
+    def __contains__(self, call_name: object) -> bool:
+        return call_name in self.configs
+
+    def is_loaded(self, call_name: str) -> bool:
+        """
+        判断客户端是否已经创建
+
+        Args:
+            call_name: 模型调用名称
+
+        Returns:
+            已创建返回 True
+        """
+        return call_name in self._clients
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 """模型适配器模块 - 抽象不同模型特性的配置差异"""
 
+import functools
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Union
 
 from .types import ToolDefinition, JSONSchema
 
@@ -17,7 +18,7 @@ class ModelAdapter(ABC):
         clear_thinking: bool,
         stream: bool,
         tools: Optional[List[ToolDefinition]],
-        json_schema: Optional[JSONSchema],
+        json_schema: Optional[Union[JSONSchema, str]],
         max_tokens: Optional[int],
     ) -> Dict[str, Any]:
         """
@@ -28,7 +29,7 @@ class ModelAdapter(ABC):
             clear_thinking: 是否清空之前的思考
             stream: 是否流式输出
             tools: 工具定义列表
-            json_schema: JSON Schema 定义（用于 vLLM 结构化输出）
+            json_schema: JSON Schema 定义或其序列化后的 JSON 字符串（用于 vLLM 结构化输出）
             max_tokens: 最大 token 数
 
         Returns:
@@ -56,6 +57,48 @@ class ModelAdapter(ABC):
         """
         pass
 
+    def build_request_params(
+        self,
+        messages: List[Dict[str, Any]],
+        model_name: str,
+        stream: bool,
+        enable_thinking: bool = False,
+        clear_thinking: bool = True,
+        tools: Optional[List[ToolDefinition]] = None,
+        json_schema: Optional[Union[JSONSchema, str]] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        构建完整的 API 请求参数
+
+        在基础参数字典上原地合并模型特定参数，返回单个字典，避免额外的合并拷贝。
+
+        Args:
+            messages: 消息列表
+            model_name: 模型名称
+            stream: 是否流式输出
+            enable_thinking: 是否开启思考模式
+            clear_thinking: 是否清空之前的思考
+            tools: 工具定义列表
+            json_schema: JSON Schema 定义或其序列化后的 JSON 字符串（用于 vLLM 结构化输出）
+            max_tokens: 最大 token 数
+
+        Returns:
+            可直接传给 chat.completions.create 的参数字典
+        """
+        params = self.get_base_params(messages, model_name, stream)
+        params.update(
+            self.get_model_specific_params(
+                enable_thinking=enable_thinking,
+                clear_thinking=clear_thinking,
+                stream=stream,
+                tools=tools,
+                json_schema=json_schema,
+                max_tokens=max_tokens,
+            )
+        )
+        return params
+
 
 class BaseModelAdapter(ModelAdapter):
     """标准 OpenAI 兼容模型适配器"""
@@ -66,7 +109,7 @@ class BaseModelAdapter(ModelAdapter):
         clear_thinking: bool,
         stream: bool,
         tools: Optional[List[ToolDefinition]],
-        json_schema: Optional[JSONSchema],
+        json_schema: Optional[Union[JSONSchema, str]],
         max_tokens: Optional[int],
     ) -> Dict[str, Any]:
         """
@@ -111,13 +154,20 @@ class BaseModelAdapter(ModelAdapter):
 class GLMAdapter(ModelAdapter):
     """GLM-4.7 特定适配器 - 支持 thinking 模式和工具流式调用"""
 
+    # (enable_thinking, clear_thinking) 只有四种组合，预先构建并共享（只读，请勿原地修改）
+    _CHAT_TEMPLATE_KWARGS: Dict[Tuple[bool, bool], Dict[str, bool]] = {
+        (enable, clear): {"enable_thinking": enable, "clear_thinking": clear}
+        for enable in (False, True)
+        for clear in (False, True)
+    }
+
     def get_model_specific_params(
         self,
         enable_thinking: bool,
         clear_thinking: bool,
         stream: bool,
         tools: Optional[List[ToolDefinition]],
-        json_schema: Optional[JSONSchema],
+        json_schema: Optional[Union[JSONSchema, str]],
         max_tokens: Optional[int],
     ) -> Dict[str, Any]:
         """
@@ -130,10 +180,7 @@ class GLMAdapter(ModelAdapter):
         """
         params = {
             "extra_body": {
-                "chat_template_kwargs": {
-                    "enable_thinking": enable_thinking,
-                    "clear_thinking": clear_thinking,
-                },
+                "chat_template_kwargs": self._CHAT_TEMPLATE_KWARGS[bool(enable_thinking), bool(clear_thinking)],
                 "parallel_tool_calls": True,
             }
         }
@@ -170,13 +217,19 @@ class Qwen35Adapter(ModelAdapter):
     与 GLM 适配器类似，但 clear_thinking 固定为 true
     """
 
+    # enable_thinking -> chat_template_kwargs，预先构建并共享（只读，请勿原地修改）
+    _CHAT_TEMPLATE_KWARGS: Dict[bool, Dict[str, bool]] = {
+        enable: {"enable_thinking": enable, "clear_thinking": True}  # Qwen3.5 固定为 true
+        for enable in (False, True)
+    }
+
     def get_model_specific_params(
         self,
         enable_thinking: bool,
         clear_thinking: bool,
         stream: bool,
         tools: Optional[List[ToolDefinition]],
-        json_schema: Optional[JSONSchema],
+        json_schema: Optional[Union[JSONSchema, str]],
         max_tokens: Optional[int],
     ) -> Dict[str, Any]:
         """
@@ -189,10 +242,7 @@ class Qwen35Adapter(ModelAdapter):
         """
         params = {
             "extra_body": {
-                "chat_template_kwargs": {
-                    "enable_thinking": enable_thinking,
-                    "clear_thinking": True,  # Qwen3.5 固定为 true
-                },
+                "chat_template_kwargs": self._CHAT_TEMPLATE_KWARGS[bool(enable_thinking)],
                 "parallel_tool_calls": True,
             }
         }
@@ -222,7 +272,6 @@ class Qwen35Adapter(ModelAdapter):
             "stream": stream,
         }
 
-
 # 模型名称到适配器的映射
 MODEL_ADAPTER_MAP: Dict[str, ModelAdapter] = {
     # 标准适配器用于任何 OpenAI 兼容的模型
@@ -233,11 +282,22 @@ MODEL_ADAPTER_MAP: Dict[str, ModelAdapter] = {
     "qwen35": Qwen35Adapter(),
 }
 
+# (模型名称中的大写标记, 适配器键)，按顺序匹配第一个命中的标记
+# Qwen3.5 需排在最前，其名称可能与其他标记同时出现
+_ADAPTER_MARKERS: Tuple[Tuple[str, str], ...] = (
+    ("QWEN3.5", "qwen35"),  # 如：Qwen3.5-397B-A17B-NVFP4
+    ("GLM", "glm"),
+)
 
+
+@functools.lru_cache(maxsize=128)
 def get_adapter_for_model(model_name: str) -> ModelAdapter:
     """
     根据模型名称获取对应的适配器
 
+    适配器均为无状态单例，结果按模型名称缓存；修改 MODEL_ADAPTER_MAP 后
+    需调用 get_adapter_for_model.cache_clear() 使缓存失效。
+
     Args:
         model_name: 模型名称
 
@@ -257,13 +317,10 @@ def get_adapter_for_model(model_name: str) -> ModelAdapter:
         >>> isinstance(adapter, BaseModelAdapter)
         True
     """
-    # Qwen3.5 模型使用 Qwen3.5 适配器（如：Qwen3.5-397B-A17B-NVFP4）
-    if "QWEN3.5" in model_name.upper():
-        return MODEL_ADAPTER_MAP["qwen35"]
-
-    # GLM 模型使用 GLM 适配器
-    if "GLM" in model_name.upper():
-        return MODEL_ADAPTER_MAP["glm"]
+    name_upper = model_name.upper()
+    for marker, adapter_key in _ADAPTER_MARKERS:
+        if marker in name_upper:
+            return MODEL_ADAPTER_MAP[adapter_key]
 
     # 其他模型使用标准适配器
     return MODEL_ADAPTER_MAP["base"]
\ No newline at end of file
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""请求合并调度模块 - 将短时间内并发到达的单条请求合并为一次批量调用"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+# 未注入 logger 时使用的默认 logger
+_default_logger = logging.getLogger(__name__)
+
+# 关闭调度线程的标记对象
+_STOP = object()
+
+
+def _approx_tokens(item: Any) -> int:
+    """按字符数粗略估计 token 数（对中文接近真实值，对英文偏保守）"""
+    return len(item) if isinstance(item, str) else 1
+
+
+class MicroBatcher:
+    """
+    请求合并器
+
+    调用方通过 submit() 提交单条输入并获得 Future；后台线程在收到第一条输入后
+    最多等待 flush_ms 毫秒，期间到达的输入合并为一次 batch_fn 调用，
+    再把结果按顺序分发给各自的 Future。
+    单批达到 max_batch 条或估计 token 数达到 max_tokens 时立即发送。
+
+    Attributes:
+        flush_ms: 收到第一条输入后的最长等待时间（毫秒）
+        max_batch: 单批最大条目数
+        max_tokens: 单批估计 token 上限
+
+    Example:
+        >>> batcher = MicroBatcher(lambda texts: client.embed(texts, model), flush_ms=50)
+        >>> future = batcher.submit("Hello world")
+        >>> vec = future.result()
+        >>> batcher.close()
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        flush_ms: float = 100,
+        max_batch: int = 64,
+        max_tokens: int = 8000,
+        name: str = "MicroBatcher",
+        logger=None,
+    ):
+        """
+        初始化请求合并器
+
+        Args:
+            batch_fn: 批量处理函数，接收输入列表，返回等长且顺序一致的结果列表
+            flush_ms: 收到第一条输入后的最长等待时间（毫秒）
+            max_batch: 单批最大条目数
+            max_tokens: 单批估计 token 上限（超长的单条输入仍会单独发送）
+            name: 后台线程名称
+            logger: 可选的 logger 实例，默认使用标准 logging
+        """
+        self.flush_ms = flush_ms
+        self.max_batch = max_batch
+        self.max_tokens = max_tokens
+        self._batch_fn = batch_fn
+        self._name = name
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.logger = logger if logger is not None else _default_logger
+
+    def submit(self, item: Any) -> Future:
+        """
+        提交单条输入
+
+        Args:
+            item: 输入（如待 embedding 的文本）
+
+        Returns:
+            Future，结果为 batch_fn 返回列表中对应位置的元素
+
+        Raises:
+            RuntimeError: 当合并器已关闭时
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self._name} is closed")
+            if self._thread is None:
+                # 首次提交时才启动后台线程
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+            self._queue.put((item, future))
+        return future
+
+    def close(self) -> None:
+        """停止后台线程，已提交的输入会先处理完"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join()
+
+    def _run(self) -> None:
+        """后台线程主循环"""
+        pending: Optional[Tuple[Any, Future]] = None
+        stopping = False
+
+        while True:
+            if pending is not None:
+                first, pending = pending, None
+            elif stopping:
+                # 收到停止信号后不再等待，处理完队列中剩余的输入即退出
+                try:
+                    first = self._queue.get_nowait()
+                except queue.Empty:
+                    return
+            else:
+                first = self._queue.get()
+                if first is _STOP:
+                    stopping = True
+                    continue
+
+            batch = [first]
+            tokens = _approx_tokens(first[0])
+            deadline = time.monotonic() + self.flush_ms / 1000.0
+
+            while len(batch) < self.max_batch and tokens < self.max_tokens:
+                timeout = 0 if stopping else deadline - time.monotonic()
+                try:
+                    entry = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    continue
+                cost = _approx_tokens(entry[0])
+                if tokens + cost > self.max_tokens:
+                    # 放入下一批，保证单批不超过 token 上限
+                    pending = entry
+                    break
+                batch.append(entry)
+                tokens += cost
+
+            self._flush(batch)
+
+    def _flush(self, batch: List[Tuple[Any, Future]]) -> None:
+        """发送一批输入并分发结果"""
+        items = [item for item, _ in batch]
+        self.logger.debug("%s: flushing batch of %d", self._name, len(items))
+        try:
+            results = self._batch_fn(items)
+            if len(results) != len(items):
+                raise ValueError(f"batch_fn returned {len(results)} results for {len(items)} inputs")
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
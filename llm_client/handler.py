@@ -1,13 +1,22 @@
 # -*- coding: utf-8 -*-
 """LLM 处理器统一入口 - 重构后的 LLMHandler 类"""
 
+import concurrent.futures
+import copy
+import functools
+import logging
 from typing import List, Dict, Any, Optional, Iterator, TYPE_CHECKING, Union
 
+from openai import OpenAI
+
 from .types import (
-    ToolDefinition, JSONSchema, StreamChunk,
+    ToolDefinition, JSONSchema, StreamChunk, StreamEvent,
     ModelNotFoundError, ClientError, OpenAIMessageBlock,
 )
+from ._cache import ResponseCache, make_cache_key, MISS
+from ._semcache import SemanticCache
 from .clients.openai_client import OpenAIClient
+from .clients.registry import ClientRegistry
 from .handlers.chat_handler import ChatHandler
 from .handlers.stream_handler import StreamHandler
 from .handlers.tool_handler import ToolHandler
@@ -15,10 +24,13 @@ from .handlers.batch_handler import BatchHandler
 from .handlers.embedding_handler import EmbeddingHandler
 
 if TYPE_CHECKING:
-    import logging
+    import httpx
 
 logger = None  # 延迟初始化，避免循环依赖
 
+# 未注入 logger 时使用的默认 logger
+_default_logger = logging.getLogger(__name__)
+
 
 class LLMHandler:
     """
@@ -27,12 +39,15 @@ class LLMHandler:
     组合各个专用处理器，提供统一的公共 API。
 
     Attributes:
-        clients: 模型调用名称到客户端实例的映射
+        clients: 模型调用名称到客户端实例的映射（ClientRegistry，按需创建）
         default_client_name: 默认模型调用名称
-        chat_handler: 非流式聊天处理器
+        chat_handler: 非流式聊天处理器（以下处理器均在首次访问时创建）
         stream_handler: 流式处理器
         tool_handler: 工具调用处理器
         batch_handler: 批量处理器
+        embedding_handler: Embedding 处理器
+        response_cache: 响应缓存（cache_size > 0 时启用，否则为 None）
+        semantic_cache: 语义缓存（设置 semantic_cache_threshold 时启用，否则为 None）
         logger: 注入的 logger 实例
 
     Example:
@@ -69,11 +84,26 @@ class LLMHandler:
         >>> results = handler.batch_llm(messages_list, max_workers=4)
     """
 
-    def __init__(self, models_config: List[Dict[str, Any]], logger=None):
+    def __init__(
+        self,
+        models_config: List[Dict[str, Any]],
+        logger=None,
+        cache_size: int = 0,
+        cache_ttl: Optional[float] = 3600,
+        semantic_cache_threshold: Optional[float] = None,
+        semantic_cache_model: str = "embedding",
+        semantic_cache_size: int = 1024,
+        embed_batch_window_ms: Optional[float] = None,
+        embed_batch_size: int = 64,
+        http_client: Optional["httpx.Client"] = None,
+        async_http_client: Optional["httpx.AsyncClient"] = None,
+        breaker_threshold: Optional[int] = None,
+        breaker_cooldown: float = 30.0,
+    ):
         """
         初始化 LLM 处理器
 
-        加载配置，创建客户端实例，初始化各个专用处理器。
+        加载配置。客户端实例在首次调用对应模型时才创建，各专用处理器在首次使用时才创建。
 
         Args:
             models_config: 模型配置列表，格式如：
@@ -82,47 +112,164 @@ class LLMHandler:
                         "call_name": "main",      # 调用名称
                         "name": "GLM-4.7",        # 模型名称
                         "api_key": "xxx",         # API 密钥
-                        "api_base": "http://..."  # API 基础 URL
+                        "api_base": "http://...", # API 基础 URL
+                        "pool_max_connections": 128,  # 可选，该模型独立连接池的最大连接数
+                        "keepalive_expiry": 90,       # 可选，空闲连接保持时间（秒）
+                        "image_format": "jpeg",       # 可选，PIL 图片编码格式（默认 "png"）
+                        "embedding_format": "array"   # 可选，embedding 返回 array.array("f")（默认 "list"）
                     },
                     ...
                 ]
             logger: 可选的 logger 实例，默认使用标准 logging
+            cache_size: 响应缓存条目数（非流式、无工具调用的聊天响应及文本 embedding），0 表示不缓存（默认）
+            cache_ttl: 缓存条目存活时间（秒），None 表示永不过期
+            semantic_cache_threshold: 语义缓存命中所需的最小余弦相似度（如 0.95），None 表示不启用（默认）
+            semantic_cache_model: 语义缓存计算 embedding 使用的模型调用名称
+            semantic_cache_size: 语义缓存最大条目数
+            embed_batch_window_ms: 并发 embed_text 请求的合并窗口（毫秒，如 50），None 表示不合并（默认）
+            embed_batch_size: 合并后单批最大文本数
+            http_client: 可选的 httpx.Client，所有模型共用（由调用方负责关闭）；
+                不传时按 base_url 共享默认连接池，配置了 pool_max_connections /
+                keepalive_expiry 的模型使用由本处理器创建并在 close() 时关闭的独立连接池；
+                http_client 和独立连接池只用于同步调用
+            async_http_client: 可选的 httpx.AsyncClient，所有模型的异步调用共用（由调用方负责关闭，
+                只能在创建它的事件循环中使用）；不传时异步调用使用按事件循环共享的默认连接池，
+                可在循环结束前调用 OpenAIClient.aclose_shared_async_pools() 释放
+            breaker_threshold: 批量调用中触发熔断的连续瞬时失败次数，None 表示不启用熔断（默认）
+            breaker_cooldown: 熔断持续时间（秒），冷却结束后只放行一个探测请求
         """
         # 初始化 logger
-        if logger is not None:
-            self.logger = logger
-        else:
-            import logging
-            self.logger = logging.getLogger(__name__)
+        self.logger = logger if logger is not None else _default_logger
+
+        self._http_client = http_client
+        self._async_http_client = async_http_client
+        # 本处理器创建的连接池，按 (pool_max_connections, keepalive_expiry) 复用，close() 时关闭
+        self._owned_http_clients: Dict[tuple, "httpx.Client"] = {}
+        # 使用非默认连接池时，(api_key, base_url, 连接池) 相同的模型共用一个 SDK 实例
+        self._sdk_pool: Dict[tuple, OpenAI] = {}
 
-        self.clients: Dict[str, OpenAIClient] = {}
+        # 只保存配置，客户端在首次使用时才创建
+        configs: Dict[str, Dict[str, Any]] = {}
         self.default_client_name: Optional[str] = None
 
-        # 初始化所有模型
         for config in models_config:
             call_name = config["call_name"]
-            label = config["name"]  # 用于日志标识
-
-            self.clients[call_name] = OpenAIClient(
-                api_key=config["api_key"],
-                base_url=config["api_base"],
-                model_name=config["name"],
-                label=label,
-                logger=self.logger,
-            )
+            configs[call_name] = config
 
             # 设置第一个模型为默认模型
             if self.default_client_name is None:
                 self.default_client_name = call_name
 
-        self.logger.info(f"LLMHandler initialized with {len(self.clients)} models, default={self.default_client_name}")
+        self.clients: ClientRegistry = ClientRegistry(configs, factory=self._create_client)
+
+        self.logger.info(
+            "LLMHandler initialized with %d models, default=%s",
+            len(self.clients), self.default_client_name,
+        )
+
+        # 各专用处理器在首次使用时创建（见下方 cached_property），使用同一个 logger
+        self._breaker_threshold = breaker_threshold
+        self._breaker_cooldown = breaker_cooldown
+        self._embed_batch_window_ms = embed_batch_window_ms
+        self._embed_batch_size = embed_batch_size
+
+        # 精确匹配响应缓存（默认关闭：采样结果本身不确定，由调用方决定是否复用）
+        self.response_cache: Optional[ResponseCache] = (
+            ResponseCache(maxsize=cache_size, ttl=cache_ttl) if cache_size > 0 else None
+        )
+
+        # 语义缓存：上下文一致时，最后一条用户消息语义相近即复用响应（默认关闭）
+        self.semantic_cache_model = semantic_cache_model
+        self.semantic_cache: Optional[SemanticCache] = (
+            SemanticCache(threshold=semantic_cache_threshold, maxsize=semantic_cache_size)
+            if semantic_cache_threshold is not None else None
+        )
+
+    @functools.cached_property
+    def chat_handler(self) -> ChatHandler:
+        """非流式聊天处理器（首次访问时创建）"""
+        return ChatHandler(self.clients, self.default_client_name, logger=self.logger)
+
+    @functools.cached_property
+    def stream_handler(self) -> StreamHandler:
+        """流式处理器（首次访问时创建）"""
+        return StreamHandler(self.clients, self.default_client_name, logger=self.logger)
+
+    @functools.cached_property
+    def tool_handler(self) -> ToolHandler:
+        """工具调用处理器（首次访问时创建）"""
+        return ToolHandler(self.clients, self.default_client_name, logger=self.logger)
+
+    @functools.cached_property
+    def batch_handler(self) -> BatchHandler:
+        """批量处理器（首次访问时创建）"""
+        return BatchHandler(
+            self.clients,
+            self.default_client_name,
+            logger=self.logger,
+            breaker_threshold=self._breaker_threshold,
+            breaker_cooldown=self._breaker_cooldown,
+        )
+
+    @functools.cached_property
+    def embedding_handler(self) -> EmbeddingHandler:
+        """Embedding 处理器（首次访问时创建）"""
+        return EmbeddingHandler(
+            self.clients,
+            self.default_client_name,
+            logger=self.logger,
+            batch_window_ms=self._embed_batch_window_ms,
+            max_batch_size=self._embed_batch_size,
+        )
+
+    def _create_client(self, config: Dict[str, Any]) -> OpenAIClient:
+        """
+        根据单个模型配置创建客户端（由 ClientRegistry 在首次访问时调用）
+
+        Args:
+            config: 模型配置
+
+        Returns:
+            OpenAIClient 实例
+        """
+        self.logger.debug("Creating client for %s", config['call_name'])
+
+        # ClientRegistry 在锁内调用本方法，下面对缓存字典的读写无需额外加锁
+        http_client = self._http_client
+        if http_client is None and ("pool_max_connections" in config or "keepalive_expiry" in config):
+            # 模型单独配置了连接池参数；httpx 连接池按主机区分连接，相同参数的模型可共用一个
+            pool_key = (config.get("pool_max_connections"), config.get("keepalive_expiry"))
+            http_client = self._owned_http_clients.get(pool_key)
+            if http_client is None:
+                http_client = self._owned_http_clients[pool_key] = OpenAIClient.build_http_client(
+                    max_connections=pool_key[0],
+                    keepalive_expiry=pool_key[1],
+                )
+
+        sdk = None
+        if http_client is not None:
+            # 默认连接池由 OpenAIClient 按 (api_key, base_url) 共享 SDK；自定义连接池在此共享
+            sdk_key = (config["api_key"], config["api_base"], id(http_client))
+            sdk = self._sdk_pool.get(sdk_key)
+            if sdk is None:
+                sdk = self._sdk_pool[sdk_key] = OpenAI(
+                    api_key=config["api_key"],
+                    base_url=config["api_base"],
+                    http_client=http_client,
+                )
 
-        # 初始化各个专用处理器，使用同一个 logger
-        self.chat_handler = ChatHandler(self.clients, self.default_client_name, logger=self.logger)
-        self.stream_handler = StreamHandler(self.clients, self.default_client_name, logger=self.logger)
-        self.tool_handler = ToolHandler(self.clients, self.default_client_name, logger=self.logger)
-        self.batch_handler = BatchHandler(self.clients, self.default_client_name, logger=self.logger)
-        self.embedding_handler = EmbeddingHandler(self.clients, self.default_client_name, logger=self.logger)
+        return OpenAIClient(
+            api_key=config["api_key"],
+            base_url=config["api_base"],
+            model_name=config["name"],
+            label=config["name"],  # 用于日志标识
+            logger=self.logger,
+            image_format=config.get("image_format", "png"),
+            embedding_format=config.get("embedding_format", "list"),
+            sdk=sdk,
+            http_client=http_client,
+            async_http_client=self._async_http_client,
+        )
 
     def call_llm(
         self,
@@ -134,7 +281,10 @@ class LLMHandler:
         clear_thinking: bool = True,
         json_schema: Optional[JSONSchema] = None,
         max_tokens: Optional[int] = None,
-    ) -> Union[str, Iterator[StreamChunk]]:
+        raw: bool = False,
+        stream_batch_size: Optional[int] = None,
+        events: bool = False,
+    ) -> Union[str, Iterator[StreamChunk], Iterator[StreamEvent]]:
         """
         统一的 LLM 调用接口
 
@@ -152,9 +302,16 @@ class LLMHandler:
             clear_thinking: 是否清空之前的思考
             json_schema: JSON Schema 定义（用于 vLLM 结构化输出）
             max_tokens: 最大生成 token 数
+            raw: 仅在 stream=True 时有效，直接产出 SDK 的 ChoiceDelta 对象，
+                跳过 StreamChunk 包装与内容累积（不产出 complete 块）
+            stream_batch_size: 仅在 stream=True 时有效，将连续的文本增量合并输出，
+                单块最多合并的增量数从 1 逐步增长到该值，None 表示逐个输出（默认）
+            events: 仅在 stream=True 时有效，产出 StreamEvent 元组而不是 StreamChunk 字典，
+                每个增量少分配两个字典，并通过 kind 区分 reasoning 与 content
 
         Returns:
-            如果 stream=True，返回 StreamChunk 迭代器
+            如果 stream=True，返回 StreamChunk 迭代器（events=True 时为 StreamEvent 迭代器，
+            raw=True 时为 ChoiceDelta 迭代器）
             如果 stream=False，返回字符串
 
         Raises:
@@ -165,7 +322,10 @@ class LLMHandler:
         if stream:
             if tools is not None:
                 # 流式 + 工具调用
-                self.logger.debug(f"call_llm: streaming with tools, model={model_name or self.default_client_name}")
+                self.logger.debug(
+                    "call_llm: streaming with tools, model=%s",
+                    model_name or self.default_client_name,
+                )
                 return self.tool_handler.handle(
                     messages=messages,
                     tools=tools,
@@ -173,20 +333,58 @@ class LLMHandler:
                     max_tokens=max_tokens,
                     enable_thinking=enable_thinking,
                     clear_thinking=clear_thinking,
+                    raw=raw,
+                    stream_batch_size=stream_batch_size,
+                    events=events,
                 )
             else:
                 # 流式普通聊天
-                self.logger.debug(f"call_llm: streaming chat, model={model_name or self.default_client_name}")
+                self.logger.debug(
+                    "call_llm: streaming chat, model=%s",
+                    model_name or self.default_client_name,
+                )
                 return self.stream_handler.handle(
                     messages=messages,
                     model_name=model_name,
                     enable_thinking=enable_thinking,
                     clear_thinking=clear_thinking,
                     max_tokens=max_tokens,
+                    raw=raw,
+                    stream_batch_size=stream_batch_size,
+                    events=events,
                 )
         else:
             # 非流式（不支持工具调用）
-            self.logger.debug(f"call_llm: non-streaming chat, model={model_name or self.default_client_name}")
+            self.logger.debug(
+                "call_llm: non-streaming chat, model=%s",
+                model_name or self.default_client_name,
+            )
+
+            return self._cached_chat(
+                messages=messages,
+                model_name=model_name,
+                enable_thinking=enable_thinking,
+                clear_thinking=clear_thinking,
+                json_schema=json_schema,
+                max_tokens=max_tokens,
+            )
+
+    def _cached_chat(
+        self,
+        messages: List[Dict[str, Any]],
+        model_name: Optional[str],
+        enable_thinking: bool,
+        clear_thinking: bool,
+        json_schema: Optional[JSONSchema],
+        max_tokens: Optional[int],
+    ) -> str:
+        """
+        非流式聊天，依次查询精确缓存和语义缓存，均未命中时调用 API 并回填
+
+        Returns:
+            LLM 返回的完整文本内容
+        """
+        if self.response_cache is None and self.semantic_cache is None:
             return self.chat_handler.handle(
                 messages=messages,
                 model_name=model_name,
@@ -196,6 +394,63 @@ class LLMHandler:
                 max_tokens=max_tokens,
             )
 
+        client_name = model_name or self.default_client_name
+        options = {
+            "enable_thinking": enable_thinking,
+            "clear_thinking": clear_thinking,
+            "json_schema": json_schema,
+            "max_tokens": max_tokens,
+        }
+
+        # 精确缓存
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = make_cache_key(client_name, messages, options)
+            cached = self.response_cache.get(cache_key)
+            if cached is not MISS:
+                self.logger.debug("call_llm: response cache hit")
+                return cached
+
+        # 语义缓存：只比较最后一条文本用户消息，其余上下文与选项作为命名空间精确匹配
+        namespace = None
+        query_vector = None
+        last = messages[-1] if messages else None
+        if (
+            self.semantic_cache is not None
+            and last is not None
+            and last.get("role") == "user"
+            and isinstance(last.get("content"), str)
+        ):
+            namespace = make_cache_key(client_name, messages[:-1], options)
+            try:
+                query_vector = self.embed_text(last["content"], model_name=self.semantic_cache_model)
+            except Exception as e:
+                # embedding 失败不影响正常调用
+                self.logger.warning("call_llm: semantic cache embedding failed, skipped: %s", e)
+                namespace = None
+            else:
+                cached = self.semantic_cache.lookup(namespace, query_vector)
+                if cached is not MISS:
+                    self.logger.debug("call_llm: semantic cache hit")
+                    if cache_key is not None:
+                        self.response_cache.set(cache_key, cached)
+                    return cached
+
+        response = self.chat_handler.handle(
+            messages=messages,
+            model_name=model_name,
+            enable_thinking=enable_thinking,
+            clear_thinking=clear_thinking,
+            json_schema=json_schema,
+            max_tokens=max_tokens,
+        )
+
+        if cache_key is not None:
+            self.response_cache.set(cache_key, response)
+        if namespace is not None:
+            self.semantic_cache.add(namespace, query_vector, response)
+        return response
+
     def batch_llm(
         self,
         messages_list: List[List[Dict[str, Any]]],
@@ -205,7 +460,10 @@ class LLMHandler:
         clear_thinking: bool = True,
         json_schema: Optional[JSONSchema] = None,
         max_tokens: Optional[int] = None,
-    ) -> List[str]:
+        token_budget: Optional[int] = None,
+        retries: int = 0,
+        return_exceptions: bool = False,
+    ) -> List[Union[str, Exception]]:
         """
         批量并发调用 LLM
 
@@ -217,6 +475,10 @@ class LLMHandler:
             clear_thinking: 是否清空之前的思考
             json_schema: JSON Schema 定义（用于 vLLM 结构化输出）
             max_tokens: 最大 token 数
+            token_budget: 每组请求的估计 prompt token 上限（如 8000），设置后按长度相近分组依次执行，
+                None 表示不分组（默认）
+            retries: 单个请求遇到限流 / 连接错误 / 5xx 时的额外重试次数（SDK 自身已有重试，默认 0）
+            return_exceptions: 为 True 时失败项为异常对象，否则为错误信息字符串（默认）
 
         Returns:
             包含所有 LLM 响应的列表，顺序与输入一致
@@ -224,7 +486,7 @@ class LLMHandler:
         Raises:
             ModelNotFoundError: 当模型调用名称无效时
         """
-        self.logger.debug(f"batch_llm: processing {len(messages_list)} requests")
+        self.logger.debug("batch_llm: processing %d requests", len(messages_list))
 
         return self.batch_handler.handle(
             messages_list=messages_list,
@@ -234,6 +496,63 @@ class LLMHandler:
             clear_thinking=clear_thinking,
             json_schema=json_schema,
             max_tokens=max_tokens,
+            token_budget=token_budget,
+            retries=retries,
+            return_exceptions=return_exceptions,
+        )
+
+    async def abatch_llm(
+        self,
+        messages_list: List[List[Dict[str, Any]]],
+        model_name: Optional[str] = None,
+        enable_thinking: bool = False,
+        clear_thinking: bool = True,
+        json_schema: Optional[JSONSchema] = None,
+        max_tokens: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        retries: int = 0,
+        return_exceptions: bool = False,
+    ) -> List[Union[str, Exception]]:
+        """
+        异步批量并发调用 LLM
+
+        基于 AsyncOpenAI 和 asyncio.gather，在单个事件循环中并发发出所有请求，
+        适合需要数百个并发请求、线程池开销过大的场景。
+
+        Args:
+            messages_list: 包含多个消息列表的列表
+            model_name: 模型调用名称
+            enable_thinking: 是否开启思考模式
+            clear_thinking: 是否清空之前的思考
+            json_schema: JSON Schema 定义（用于 vLLM 结构化输出）
+            max_tokens: 最大 token 数
+            max_concurrency: 同时在途的最大请求数（如 64），None 表示不限制
+            retries: 单个请求遇到瞬时错误时的额外重试次数，默认 0
+            return_exceptions: 为 True 时失败项为异常对象，否则为错误信息字符串（默认）
+
+        Returns:
+            包含所有 LLM 响应的列表，顺序与输入一致
+
+        Raises:
+            ModelNotFoundError: 当模型调用名称无效时
+
+        Example:
+            >>> results = await handler.abatch_llm(messages_list, max_concurrency=64)
+            >>> # 同步代码中
+            >>> results = asyncio.run(handler.abatch_llm(messages_list))
+        """
+        self.logger.debug("abatch_llm: processing %d requests", len(messages_list))
+
+        return await self.batch_handler.ahandle(
+            messages_list=messages_list,
+            model_name=model_name,
+            enable_thinking=enable_thinking,
+            clear_thinking=clear_thinking,
+            json_schema=json_schema,
+            max_tokens=max_tokens,
+            max_concurrency=max_concurrency,
+            retries=retries,
+            return_exceptions=return_exceptions,
         )
 
     @property
@@ -241,6 +560,8 @@ class LLMHandler:
         """
         获取模型配置（向后兼容属性）
 
+        会创建全部尚未创建的客户端；只需要调用名称时请使用 model_names。
+
         Returns:
             模型名称到配置的映射
         """
@@ -283,7 +604,19 @@ class LLMHandler:
             >>> vec = handler.embed_text("Hello world", dimensions=128)  # 使用 128 维
             >>> print(len(vec))  # 128
         """
-        return self.embedding_handler.handle_text(text, model_name=model_name, dimensions=dimensions)
+        if self.response_cache is None:
+            return self.embedding_handler.handle_text(text, model_name=model_name, dimensions=dimensions)
+
+        # embedding 结果是确定的，开启响应缓存时同样复用
+        cache_key = make_cache_key("embed", model_name or self.default_client_name, text, dimensions)
+        cached = self.response_cache.get(cache_key)
+        if cached is not MISS:
+            # 返回副本，调用方原地修改向量不影响缓存
+            return copy.copy(cached)
+        vector = self.embedding_handler.handle_text(text, model_name=model_name, dimensions=dimensions)
+        # 按原类型（list 或 array.array）缓存副本，命中与未命中返回相同类型
+        self.response_cache.set(cache_key, copy.copy(vector))
+        return vector
 
     def batch_embed_text(
         self,
@@ -311,7 +644,24 @@ class LLMHandler:
             >>> print(len(vecs))  # 3
             >>> print(len(vecs[0]))  # 128
         """
-        return self.embedding_handler.handle_text_batch(texts, model_name=model_name, dimensions=dimensions)
+        if self.response_cache is None:
+            return self.embedding_handler.handle_text_batch(texts, model_name=model_name, dimensions=dimensions)
+
+        # 只为未命中缓存的文本发起一次批量请求
+        client_name = model_name or self.default_client_name
+        keys = [make_cache_key("embed", client_name, text, dimensions) for text in texts]
+        vectors = [self.response_cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is MISS]
+        # 命中的向量返回副本，调用方原地修改不影响缓存
+        vectors = [vector if vector is MISS else copy.copy(vector) for vector in vectors]
+        if missing:
+            fetched = self.embedding_handler.handle_text_batch(
+                [texts[i] for i in missing], model_name=model_name, dimensions=dimensions
+            )
+            for i, vector in zip(missing, fetched):
+                vectors[i] = vector
+                self.response_cache.set(keys[i], copy.copy(vector))
+        return vectors
 
     def embed_multimodal(
         self,
@@ -353,16 +703,18 @@ class LLMHandler:
         msg_blocks: List[OpenAIMessageBlock],
         model_name: Optional[str] = "embedding",
         max_workers: int = 4,
+        dimensions: Optional[int] = None,
     ) -> List[List[float]]:
         """
         批量图文混合 embedding
 
-        使用线程池并发处理多个消息块。
+        纯文本消息块合并为一次请求，含图片的消息块使用线程池并发处理。
 
         Args:
             msg_blocks: OpenAI 格式的消息块列表
             model_name: 模型调用名称（可选，默认使用 "embedding"）
             max_workers: 最大并发线程数
+            dimensions: Matryoshka Embeddings 维度（可选）
 
         Returns:
             embedding 向量列表，顺序与输入一致
@@ -374,4 +726,102 @@ class LLMHandler:
             >>> vecs = handler.batch_embed_multimodal([msg1, msg2, msg3], max_workers=4)
             >>> print(len(vecs))  # 3
         """
-        return self.embedding_handler.handle_multimodal_batch(msg_blocks, model_name=model_name, max_workers=max_workers)
\ No newline at end of file
+        return self.embedding_handler.handle_multimodal_batch(
+            msg_blocks, model_name=model_name, max_workers=max_workers, dimensions=dimensions
+        )
+
+    async def abatch_embed_text(
+        self,
+        texts: List[str],
+        model_name: Optional[str] = "embedding",
+        dimensions: Optional[int] = None,
+    ) -> List[List[float]]:
+        """
+        异步批量文本 embedding，参数与返回值同 batch_embed_text
+
+        Example:
+            >>> vecs = await handler.abatch_embed_text(["text1", "text2"], dimensions=128)
+        """
+        return await self.embedding_handler.ahandle_text_batch(texts, model_name=model_name, dimensions=dimensions)
+
+    async def abatch_embed_multimodal(
+        self,
+        msg_blocks: List[OpenAIMessageBlock],
+        model_name: Optional[str] = "embedding",
+        dimensions: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> List[List[float]]:
+        """
+        异步批量图文混合 embedding
+
+        基于 AsyncOpenAI，在单个事件循环中并发发出所有请求，不受线程数限制。
+
+        Args:
+            msg_blocks: OpenAI 格式的消息块列表
+            model_name: 模型调用名称（可选，默认使用 "embedding"）
+            dimensions: Matryoshka Embeddings 维度（可选）
+            max_concurrency: 同时在途的最大请求数，None 表示不限制
+
+        Returns:
+            embedding 向量列表，顺序与输入一致
+
+        Raises:
+            ModelNotFoundError: 当模型调用名称无效时
+
+        Example:
+            >>> vecs = await handler.abatch_embed_multimodal([msg1, msg2, msg3], max_concurrency=32)
+        """
+        return await self.embedding_handler.ahandle_multimodal_batch(
+            msg_blocks, model_name=model_name, dimensions=dimensions, max_concurrency=max_concurrency
+        )
+
+    def warmup(self, call_names: Optional[List[str]] = None, connections: int = 1) -> int:
+        """
+        预先建立到各模型服务端的连接，使首次调用不承担 TCP/TLS 握手耗时
+
+        共用同一 SDK 实例（即同一连接池和端点）的模型只预热一次，不同端点并发预热。
+        会创建所涉及模型的客户端。
+
+        Args:
+            call_names: 要预热的模型调用名称，None 表示全部模型
+            connections: 每个端点预先建立的连接数，按预期并发量设置
+
+        Returns:
+            成功完成的预热请求总数
+
+        Raises:
+            ModelNotFoundError: 当模型调用名称无效时
+
+        Example:
+            >>> handler = LLMHandler(models_config)
+            >>> handler.warmup(["main"], connections=8)
+        """
+        names = list(self.clients) if call_names is None else call_names
+        unique = {}
+        for name in names:
+            if name not in self.clients:
+                raise ModelNotFoundError(f"Unknown model call name: {name}")
+            client = self.clients[name]
+            unique.setdefault(id(getattr(client, "client", client)), client)
+
+        if not unique:
+            return 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(unique)) as executor:
+            total = sum(executor.map(lambda c: c.warmup(connections), unique.values()))
+        self.logger.debug("warmup: %d connections to %d endpoints", total, len(unique))
+        return total
+
+    def close(self) -> None:
+        """
+        释放后台资源：embedding 请求合并线程和共享线程池，以及本处理器创建的独立连接池
+
+        按 base_url 共享的默认连接池和调用方传入的 http_client 不会被关闭。
+        使用了独立连接池的模型在 close() 之后不能再发起请求。
+        """
+        # 未使用过 embedding 时不必为关闭而创建处理器
+        if "embedding_handler" in self.__dict__:
+            self.embedding_handler.close()
+        for http_client in self._owned_http_clients.values():
+            http_client.close()
+        self._owned_http_clients.clear()
+        self._sdk_pool.clear()
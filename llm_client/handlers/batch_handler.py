@@ -1,23 +1,77 @@
 # -*- coding: utf-8 -*-
 """批量处理器 - 批量并发处理器"""
 
+import asyncio
 import concurrent.futures
-from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
+import functools
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Union
 
 from ..types import ToolDefinition, JSONSchema, ModelNotFoundError, ClientError
 from ..clients.base_client import BaseLLMClient
-
-if TYPE_CHECKING:
-    import logging
+from .._retry import CircuitBreaker, call_with_retry, acall_with_retry, is_transient
 
 logger = None  # 将在初始化时注入
 
+# 未注入 logger 时使用的默认 logger
+_default_logger = logging.getLogger(__name__)
+
+
+def _approx_length(messages: List[Dict[str, Any]]) -> int:
+    """粗略估计消息列表的长度（字符数），用于调度排序"""
+    total = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            total += len(content)
+        elif isinstance(content, list):
+            for part in content:
+                text = part.get("text") if isinstance(part, dict) else None
+                if isinstance(text, str):
+                    total += len(text)
+    return total
+
+
+def _estimate_tokens(length: int) -> int:
+    """按约 4 字符 / token 由字符数粗略估计 token 数"""
+    return length // 4 + 1
+
+
+def _pack_by_budget(order: List[int], estimates: List[int], token_budget: int) -> List[List[int]]:
+    """
+    按 token 预算贪心分组
+
+    Args:
+        order: 已按长度排序的索引
+        estimates: 每个请求的 token 估计值
+        token_budget: 每组 token 上限（超过上限的单个请求独占一组）
+
+    Returns:
+        索引分组列表，组内与组间均保持 order 的顺序
+    """
+    groups: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for index in order:
+        cost = estimates[index]
+        if current and current_tokens + cost > token_budget:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += cost
+    if current:
+        groups.append(current)
+    return groups
+
 
 class BatchHandler:
     """
     批量并发处理器
 
-    使用线程池并发批量调用 LLM，保持顺序与输入一致。
+    使用线程池并发批量调用 LLM，结果顺序始终与输入一致。
+    设置 breaker_threshold 时每个客户端维护一个熔断器：连续多次瞬时失败（限流 / 连接错误 / 5xx）后，
+    冷却期内该客户端的剩余请求直接失败，不再占用线程等待超时；冷却结束后只放行一个探测请求。
 
     Attributes:
         clients: 模型名称到客户端实例的映射
@@ -38,7 +92,14 @@ class BatchHandler:
         >>> print(len(results))  # 2
     """
 
-    def __init__(self, clients: Dict[str, BaseLLMClient], default_client_name: Optional[str] = None, logger=None):
+    def __init__(
+        self,
+        clients: Dict[str, BaseLLMClient],
+        default_client_name: Optional[str] = None,
+        logger=None,
+        breaker_threshold: Optional[int] = None,
+        breaker_cooldown: float = 30.0,
+    ):
         """
         初始化批量处理器
 
@@ -46,15 +107,17 @@ class BatchHandler:
             clients: 模型调用名称到客户端实例的映射
             default_client_name: 默认客户端名称
             logger: 可选的 logger 实例，默认使用标准 logging
+            breaker_threshold: 触发熔断的连续瞬时失败次数，None 表示不启用熔断（默认）
+            breaker_cooldown: 熔断持续时间（秒）
         """
         self.clients = clients
         self.default_client_name = default_client_name
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
 
-        if logger is not None:
-            self.logger = logger
-        else:
-            import logging
-            self.logger = logging.getLogger(__name__)
+        self.logger = logger if logger is not None else _default_logger
 
     def handle(
         self,
@@ -65,7 +128,10 @@ class BatchHandler:
         clear_thinking: bool = True,
         json_schema: Optional[JSONSchema] = None,
         max_tokens: Optional[int] = None,
-    ) -> List[str]:
+        token_budget: Optional[int] = None,
+        retries: int = 0,
+        return_exceptions: bool = False,
+    ) -> List[Union[str, Exception]]:
         """
         处理批量并发请求
 
@@ -77,6 +143,13 @@ class BatchHandler:
             clear_thinking: 是否清空之前的思考
             json_schema: JSON Schema 定义（用于 vLLM 结构化输出）
             max_tokens: 最大 token 数
+            token_budget: 每组请求的估计 prompt token 上限。设置后按长度排序的请求
+                被贪心打包成若干组，组与组依次执行、组内并发，使同时在服务端调度的
+                请求长度相近；None 表示不分组（默认）
+            retries: 单个请求遇到瞬时错误时的额外重试次数（指数退避 + 抖动）。
+                SDK 自身已对连接错误、429 和 5xx 重试，默认不再叠加
+            return_exceptions: 为 True 时失败项为异常对象，可用 isinstance(result, Exception)
+                区分；为 False 时失败项为错误信息字符串（默认）
 
         Returns:
             包含所有 LLM 响应的列表，顺序与输入一致
@@ -93,37 +166,196 @@ class BatchHandler:
         if len(messages_list) == 0:
             return []
 
-        self.logger.info(f"BatchHandler: processing {len(messages_list)} requests with {max_workers} workers")
+        # 整批共用同一模型名称，只解析一次
+        model = client.get_model_name()
 
-        results = [None] * len(messages_list)
+        self.logger.info(
+            "BatchHandler: processing %d requests with %s workers",
+            len(messages_list), max_workers,
+        )
 
-        def process_single(index: int, messages: List[Dict[str, Any]]) -> Tuple[int, str]:
-            """处理单个请求"""
+        breaker = self._get_breaker(client_name)
+
+        # 整批相同的请求参数只绑定一次，逐条调用时只传 messages
+        # 批量调用通常不需要流式输出，强制 stream=False
+        call_single = functools.partial(
+            client.chat,
+            model_name=model,
+            stream=False,
+            enable_thinking=enable_thinking,
+            clear_thinking=clear_thinking,
+            tools=None,
+            json_schema=json_schema,
+            max_tokens=max_tokens,
+        )
+
+        def process_single(index: int, messages: List[Dict[str, Any]]) -> Tuple[int, Union[str, Exception]]:
+            """处理单个请求，熔断状态下直接失败"""
+            if breaker is not None and not breaker.allow():
+                return index, self._skip_open(index, client_name, return_exceptions)
             try:
-                # 批量调用通常不需要流式输出，强制 stream=False
-                result = client.chat(
-                    messages=messages,
-                    model_name=client.get_model_name(),
-                    stream=False,
-                    enable_thinking=enable_thinking,
-                    clear_thinking=clear_thinking,
-                    tools=None,
-                    json_schema=json_schema,
-                    max_tokens=max_tokens,
-                )
-                return index, result
+                result = call_with_retry(lambda: call_single(messages), retries=retries)
             except Exception as e:
-                self.logger.error(f"Batch request {index} failed: {str(e)}", exc_info=True)
-                return index, str(e)
+                return index, self._failure(index, e, breaker, return_exceptions)
+            if breaker is not None:
+                breaker.record_success()
+            return index, result
 
+        # 最长的请求最先提交，避免长请求排在队尾拖慢整批完成时间
+        lengths = [_approx_length(messages) for messages in messages_list]
+        order = sorted(range(len(messages_list)), key=lengths.__getitem__, reverse=True)
+
+        if token_budget is not None:
+            groups = _pack_by_budget(order, [_estimate_tokens(length) for length in lengths], token_budget)
+            self.logger.debug(
+                "BatchHandler: packed into %d groups with token_budget=%s",
+                len(groups), token_budget,
+            )
+        else:
+            groups = [order]
+
+        results: List[Union[str, Exception]] = [""] * len(messages_list)
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_index = {
-                executor.submit(process_single, i, messages): i
-                for i, messages in enumerate(messages_list)
-            }
-            for future in concurrent.futures.as_completed(future_to_index):
-                index, response = future.result()
-                results[index] = response
-
-        self.logger.debug(f"BatchHandler: completed {len(results)} requests")
-        return results
\ No newline at end of file
+            for group in groups:
+                # 先提交整组再等待，按索引回填，结果顺序与输入一致。单个请求的失败已转换为失败项，
+                # process_single 本身抛出的意外异常会取消组内尚未开始的请求并立即向上抛出
+                futures = [executor.submit(process_single, i, messages_list[i]) for i in group]
+                done, pending = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_EXCEPTION
+                )
+                for future in pending:
+                    future.cancel()
+                for future in done:
+                    index, result = future.result()
+                    results[index] = result
+
+        self.logger.debug("BatchHandler: completed %d requests", len(results))
+        return results
+
+    def _get_breaker(self, client_name: str) -> Optional[CircuitBreaker]:
+        """获取（必要时创建）客户端对应的熔断器，未启用熔断时返回 None"""
+        if self.breaker_threshold is None:
+            return None
+        with self._breakers_lock:
+            breaker = self._breakers.get(client_name)
+            if breaker is None:
+                breaker = self._breakers[client_name] = CircuitBreaker(
+                    threshold=self.breaker_threshold,
+                    cooldown=self.breaker_cooldown,
+                )
+            return breaker
+
+    def _skip_open(self, index: int, client_name: str, return_exceptions: bool) -> Union[str, Exception]:
+        """熔断状态下的快速失败项"""
+        error = ClientError(f"Circuit open for model call name {client_name}, request skipped")
+        self.logger.warning("Batch request %d skipped: %s", index, error)
+        return error if return_exceptions else str(error)
+
+    def _failure(
+        self,
+        index: int,
+        error: Exception,
+        breaker: Optional[CircuitBreaker],
+        return_exceptions: bool,
+    ) -> Union[str, Exception]:
+        """记录失败并转换为结果列表中的失败项，只有瞬时错误计入熔断"""
+        if breaker is not None:
+            if is_transient(error):
+                breaker.record_failure()
+            else:
+                # 非瞬时错误（如 400）说明服务端可以正常响应，视为健康，同时结束半开探测
+                breaker.record_success()
+        self.logger.error(
+            "Batch request %d failed: %s", index, error,
+            exc_info=error if self.logger.isEnabledFor(logging.DEBUG) else None,
+        )
+        return error if return_exceptions else str(error)
+
+    async def ahandle(
+        self,
+        messages_list: List[List[Dict[str, Any]]],
+        model_name: Optional[str] = None,
+        enable_thinking: bool = False,
+        clear_thinking: bool = True,
+        json_schema: Optional[JSONSchema] = None,
+        max_tokens: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        retries: int = 0,
+        return_exceptions: bool = False,
+    ) -> List[Union[str, Exception]]:
+        """
+        异步处理批量并发请求
+
+        在单个事件循环中通过 asyncio.gather 并发发出所有请求，不占用额外线程。
+
+        Args:
+            messages_list: 包含多个消息列表的列表
+            model_name: 模型调用名称
+            enable_thinking: 是否开启思考模式
+            clear_thinking: 是否清空之前的思考
+            json_schema: JSON Schema 定义（用于 vLLM 结构化输出）
+            max_tokens: 最大 token 数
+            max_concurrency: 同时在途的最大请求数，None 表示不限制
+            retries: 单个请求遇到瞬时错误时的额外重试次数，默认不重试
+            return_exceptions: 为 True 时失败项为异常对象，否则为错误信息字符串（默认）
+
+        Returns:
+            包含所有 LLM 响应的列表，顺序与输入一致
+
+        Raises:
+            ModelNotFoundError: 当模型调用名称无效时
+        """
+        client_name = model_name or self.default_client_name
+        client = self.clients.get(client_name)
+
+        if not client:
+            raise ModelNotFoundError(f"Unknown model call name: {client_name}")
+
+        if len(messages_list) == 0:
+            return []
+
+        self.logger.info(
+            "BatchHandler: processing %d async requests, max_concurrency=%s",
+            len(messages_list), max_concurrency,
+        )
+
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        breaker = self._get_breaker(client_name)
+        # 整批相同的请求参数只绑定一次
+        achat = functools.partial(
+            client.achat,
+            model_name=client.get_model_name(),
+            stream=False,
+            enable_thinking=enable_thinking,
+            clear_thinking=clear_thinking,
+            tools=None,
+            json_schema=json_schema,
+            max_tokens=max_tokens,
+        )
+
+        async def process_single(index: int, messages: List[Dict[str, Any]]) -> Union[str, Exception]:
+            """处理单个请求"""
+            if semaphore is None:
+                return await call_single(index, messages)
+            async with semaphore:
+                return await call_single(index, messages)
+
+        async def call_single(index: int, messages: List[Dict[str, Any]]) -> Union[str, Exception]:
+            """发出单个请求，失败时返回失败项"""
+            if breaker is not None and not breaker.allow():
+                return self._skip_open(index, client_name, return_exceptions)
+            try:
+                result = await acall_with_retry(lambda: achat(messages), retries=retries)
+            except Exception as e:
+                return self._failure(index, e, breaker, return_exceptions)
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+        # gather 按传入顺序返回结果
+        results = await asyncio.gather(
+            *[process_single(i, messages) for i, messages in enumerate(messages_list)]
+        )
+
+        self.logger.debug("BatchHandler: completed %d async requests", len(results))
+        return list(results)
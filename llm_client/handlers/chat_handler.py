@@ -1,16 +1,17 @@
 # -*- coding: utf-8 -*-
 """聊天处理器 - 非流式聊天处理器"""
 
-from typing import List, Dict, Any, Optional, TYPE_CHECKING
+import logging
+from typing import List, Dict, Any, Optional
 
 from ..types import ToolDefinition, JSONSchema, ModelNotFoundError, ClientError
 from ..clients.base_client import BaseLLMClient
 
-if TYPE_CHECKING:
-    import logging
-
 logger = None  # 将在初始化时注入
 
+# 未注入 logger 时使用的默认 logger
+_default_logger = logging.getLogger(__name__)
+
 
 class ChatHandler:
     """
@@ -45,11 +46,7 @@ class ChatHandler:
         self.clients = clients
         self.default_client_name = default_client_name
 
-        if logger is not None:
-            self.logger = logger
-        else:
-            import logging
-            self.logger = logging.getLogger(__name__)
+        self.logger = logger if logger is not None else _default_logger
 
     def handle(
         self,
@@ -84,7 +81,7 @@ class ChatHandler:
         if not client:
             raise ModelNotFoundError(f"Unknown model call name: {client_name}")
 
-        self.logger.debug(f"ChatHandler: calling {client_name}, messages={len(messages)}")
+        self.logger.debug("ChatHandler: calling %s, messages=%d", client_name, len(messages))
 
         try:
             # 使用客户端进行非流式调用
@@ -99,11 +96,14 @@ class ChatHandler:
                 max_tokens=max_tokens,
             )
 
-            self.logger.debug(f"ChatHandler: response length={len(response)}")
+            self.logger.debug("ChatHandler: response length=%d", len(response))
             return response
 
         except ClientError:
             raise
         except Exception as e:
-            self.logger.error(f"ChatHandler error: {str(e)}", exc_info=True)
+            self.logger.error(
+                "ChatHandler error: %s", e,
+                exc_info=self.logger.isEnabledFor(logging.DEBUG),
+            )
             raise ClientError(f"Chat handling failed: {str(e)}") from e
\ No newline at end of file
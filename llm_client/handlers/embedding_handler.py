@@ -1,27 +1,34 @@
 # -*- coding: utf-8 -*-
 """Embedding 处理器 - 统一处理文本和多模态 embedding"""
 
+import asyncio
 import concurrent.futures
-from typing import List, Dict, Any, Optional, TYPE_CHECKING
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from ..types import OpenAIMessageBlock, ModelNotFoundError, ClientError
 from ..clients.base_client import BaseLLMClient
-
-if TYPE_CHECKING:
-    import logging
+from ..dispatch import MicroBatcher
 
 logger = None  # 将在初始化时注入
 
+# 未注入 logger 时使用的默认 logger
+_default_logger = logging.getLogger(__name__)
+
 
 class EmbeddingHandler:
     """
     Embedding 处理器
 
     统一处理文本 embedding 和多模态（图文）embedding。
+    设置 batch_window_ms 后，并发的 handle_text 调用会在该时间窗口内合并为一次批量请求。
 
     Attributes:
         clients: 模型名称到客户端实例的映射
         default_client_name: 默认客户端名称
+        batch_window_ms: 单文本请求合并窗口（毫秒），None 表示不合并
+        max_batch_size: 合并后单批最大文本数
         logger: 注入的 logger 实例
 
     Example:
@@ -32,7 +39,14 @@ class EmbeddingHandler:
         >>> vec = handler.handle_multimodal(msg)
     """
 
-    def __init__(self, clients: Dict[str, BaseLLMClient], default_client_name: Optional[str] = None, logger=None):
+    def __init__(
+        self,
+        clients: Dict[str, BaseLLMClient],
+        default_client_name: Optional[str] = None,
+        logger=None,
+        batch_window_ms: Optional[float] = None,
+        max_batch_size: int = 64,
+    ):
         """
         初始化 Embedding 处理器
 
@@ -40,15 +54,22 @@ class EmbeddingHandler:
             clients: 模型调用名称到客户端实例的映射
             default_client_name: 默认客户端名称
             logger: 可选的 logger 实例，默认使用标准 logging
+            batch_window_ms: 单文本请求合并窗口（毫秒），None 表示不合并（默认）
+            max_batch_size: 合并后单批最大文本数
         """
         self.clients = clients
         self.default_client_name = default_client_name
+        self.batch_window_ms = batch_window_ms
+        self.max_batch_size = max_batch_size
 
-        if logger is not None:
-            self.logger = logger
-        else:
-            import logging
-            self.logger = logging.getLogger(__name__)
+        # (调用名称, 维度) -> 合并器，维度不同的请求不能放进同一批
+        self._batchers: Dict[Tuple[str, Optional[int]], MicroBatcher] = {}
+        self._lock = threading.Lock()
+
+        # 并发线程数 -> 线程池，批量多模态 embedding 复用，避免每次调用创建和销毁线程
+        self._executors: Dict[int, concurrent.futures.ThreadPoolExecutor] = {}
+
+        self.logger = logger if logger is not None else _default_logger
 
     def _get_client(self, model_name: Optional[str]) -> BaseLLMClient:
         """获取客户端实例"""
@@ -58,6 +79,74 @@ class EmbeddingHandler:
             raise ModelNotFoundError(f"Unknown model call name: {client_name}")
         return client
 
+    def _get_batcher(self, client_name: str, client: BaseLLMClient, dimensions: Optional[int]) -> MicroBatcher:
+        """获取（必要时创建）指定模型和维度的请求合并器"""
+        key = (client_name, dimensions)
+        batcher = self._batchers.get(key)
+        if batcher is not None:
+            return batcher
+
+        with self._lock:
+            batcher = self._batchers.get(key)
+            if batcher is None:
+                model = client.get_model_name()
+                batcher = self._batchers[key] = MicroBatcher(
+                    lambda texts: client.embed(texts, model, dimensions=dimensions),
+                    flush_ms=self.batch_window_ms,
+                    max_batch=self.max_batch_size,
+                    name=f"EmbeddingBatcher-{client_name}",
+                    logger=self.logger,
+                )
+        return batcher
+
+    def _get_executor(self, max_workers: int) -> concurrent.futures.ThreadPoolExecutor:
+        """获取（必要时创建）指定并发数的共享线程池"""
+        with self._lock:
+            executor = self._executors.get(max_workers)
+            if executor is None:
+                executor = self._executors[max_workers] = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix="embed-mm",
+                )
+            return executor
+
+    def _parallel_map(
+        self,
+        fn: Callable[[int], Tuple[int, List[float]]],
+        indices: List[int],
+        max_workers: int,
+    ) -> Iterator[Tuple[int, List[float]]]:
+        """
+        在共享线程池中并发执行 fn，按完成顺序产出结果
+
+        先提交全部任务、再统一收集：在提交循环中调用 result() 会让请求退化为串行，
+        因此提交与收集必须分成两个循环。fn 需自行处理异常并在结果中带回索引。
+
+        Args:
+            fn: 接收索引、返回 (索引, 结果) 的函数
+            indices: 待处理的索引列表
+            max_workers: 线程池并发数
+
+        Yields:
+            (索引, 结果)，顺序为完成顺序
+        """
+        executor = self._get_executor(max_workers)
+        futures = [executor.submit(fn, index) for index in indices]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+    def close(self) -> None:
+        """停止所有请求合并器和共享线程池的后台线程（已提交的请求会先处理完）"""
+        with self._lock:
+            batchers = list(self._batchers.values())
+            self._batchers.clear()
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for batcher in batchers:
+            batcher.close()
+        for executor in executors:
+            executor.shutdown(wait=True)
+
     def handle_text(self, text: str, model_name: Optional[str] = None, dimensions: Optional[int] = None) -> List[float]:
         """
         处理单文本 embedding
@@ -75,16 +164,28 @@ class EmbeddingHandler:
             ClientError: 当 API 调用失败时
         """
         client = self._get_client(model_name)
-        self.logger.debug(f"EmbeddingHandler: text embedding, text_len={len(text)}, dimensions={dimensions}")
+        self.logger.debug(
+            "EmbeddingHandler: text embedding, text_len=%d, dimensions=%s",
+            len(text), dimensions,
+        )
+
+        if self.batch_window_ms is not None:
+            # 与窗口内其他并发请求合并为一次批量调用
+            batcher = self._get_batcher(model_name or self.default_client_name, client, dimensions)
+            return batcher.submit(text).result()
 
         result = client.embed(text, client.get_model_name(), dimensions=dimensions)
-        # 确保返回单个 embedding
-        return result[0] if isinstance(result, list) and len(result) > 0 and isinstance(result[0], list) else result
+        return self._single_vector(result)
 
-    def handle_text_batch(self, texts: List[str], model_name: Optional[str] = None, dimensions: Optional[int] = None) -> List[List[float]]:
+    def handle_text_batch(
+        self, texts: List[str], model_name: Optional[str] = None, dimensions: Optional[int] = None
+    ) -> List[List[float]]:
         """
         处理批量文本 embedding
 
+        所有文本在一次 API 请求中发送，服务端（如 vLLM）可利用连续批处理统一计算，
+        相比逐条调用 handle_text 只需一次网络往返，批量越大收益越明显。
+
         Args:
             texts: 文本列表
             model_name: 模型调用名称
@@ -98,11 +199,19 @@ class EmbeddingHandler:
             ClientError: 当 API 调用失败时
         """
         client = self._get_client(model_name)
-        self.logger.debug(f"EmbeddingHandler: batch text embedding, count={len(texts)}, dimensions={dimensions}")
+        self.logger.debug(
+            "EmbeddingHandler: batch text embedding, count=%d, dimensions=%s",
+            len(texts), dimensions,
+        )
 
         return client.embed(texts, client.get_model_name(), dimensions=dimensions)
 
-    def handle_multimodal(self, msg_block: OpenAIMessageBlock, model_name: Optional[str] = None, dimensions: Optional[int] = None) -> List[float]:
+    def handle_multimodal(
+        self,
+        msg_block: OpenAIMessageBlock,
+        model_name: Optional[str] = None,
+        dimensions: Optional[int] = None,
+    ) -> List[float]:
         """
         处理图文混合 embedding
 
@@ -121,48 +230,103 @@ class EmbeddingHandler:
             ClientError: 当 API 调用失败时
         """
         client = self._get_client(model_name)
+        input_text, extra_body = self._multimodal_input(msg_block)
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            image_count = len(extra_body["image"]) if extra_body else 0
+            self.logger.debug(
+                "EmbeddingHandler: multimodal embedding, text_len=%d, image_count=%d, "
+                "dimensions=%s",
+                len(input_text), image_count, dimensions,
+            )
 
-        # 处理 OpenAI 消息块格式
+        # 调用 embed
+        result = client.embed(
+            input_text, client.get_model_name(), extra_body=extra_body, dimensions=dimensions
+        )
+        return self._single_vector(result)
+
+    @staticmethod
+    def _single_vector(result: Any) -> List[float]:
+        """确保返回单个 embedding（单条输入也可能返回仅含一个向量的列表）"""
+        if isinstance(result, list) and len(result) > 0 and not isinstance(result[0], (int, float)):
+            return result[0]
+        return result
+
+    @staticmethod
+    def _multimodal_input(msg_block: OpenAIMessageBlock) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        提取 OpenAI 消息块中的文本和图片
+
+        Args:
+            msg_block: OpenAI 格式的消息块
+
+        Returns:
+            (拼接后的文本, 包含图片的 extra_body 或 None)
+        """
         text_parts = []
         images = []
 
-        for item in msg_block.get("content", []):
-            if item.get("type") == "text":
+        for item in msg_block.get("content", ()):
+            item_type = item.get("type")
+            if item_type == "text":
                 text_parts.append(item.get("text", ""))
-            elif item.get("type") == "image_url":
-                url = item.get("image_url", {}).get("url", "")
+            elif item_type == "image_url":
+                # 不用 item.get("image_url", {})：默认值字典在每次调用时都会被分配
+                image_url = item.get("image_url")
+                url = image_url.get("url") if image_url else None
                 if url:
                     images.append(url)
-            elif item.get("type") == "image_pil":
+            elif item_type == "image_pil":
                 # PIL 图片会在 extra_body 中处理
                 pass  # 留给 embed() 方法处理
 
-        # 准备输入参数
         input_text = " ".join(text_parts) or ""
         extra_body = {"image": images} if images else None
+        return input_text, extra_body
 
-        self.logger.debug(f"EmbeddingHandler: multimodal embedding, text_len={len(input_text)}, image_count={len(images)}, dimensions={dimensions}")
+    @staticmethod
+    def _has_images(msg_block: OpenAIMessageBlock) -> bool:
+        """消息块是否包含图片（image_url 或 image_pil）"""
+        return any(item.get("type") in ("image_url", "image_pil") for item in msg_block.get("content", ()))
 
-        # 调用 embed
-        result = client.embed(input_text, client.get_model_name(), extra_body=extra_body, dimensions=dimensions)
-        # 确保返回单个 embedding
-        return result[0] if isinstance(result, list) and len(result) > 0 and isinstance(result[0], list) else result
+    def _partition(self, msg_blocks: List[OpenAIMessageBlock]) -> Tuple[List[int], List[str], List[int]]:
+        """
+        将消息块分为纯文本和含图片两组
+
+        Returns:
+            (纯文本消息块的索引, 对应的拼接文本, 含图片消息块的索引)
+        """
+        text_indices: List[int] = []
+        texts: List[str] = []
+        image_indices: List[int] = []
+        for index, msg_block in enumerate(msg_blocks):
+            if self._has_images(msg_block):
+                image_indices.append(index)
+            else:
+                text_indices.append(index)
+                texts.append(self._multimodal_input(msg_block)[0])
+        return text_indices, texts, image_indices
 
     def handle_multimodal_batch(
         self,
         msg_blocks: List[OpenAIMessageBlock],
         model_name: Optional[str] = None,
         max_workers: int = 4,
+        dimensions: Optional[int] = None,
     ) -> List[List[float]]:
         """
         处理批量图文混合 embedding
 
-        使用线程池并发处理多个消息块，保持结果顺序与输入一致。
+        不含图片的消息块合并为一次批量文本 embedding 请求；含图片的消息块使用共享线程池
+        逐个并发请求。结果顺序与输入一致。
+        线程池按 max_workers 创建一次并在后续调用中复用，close() 时关闭。
 
         Args:
             msg_blocks: OpenAI 格式的消息块列表
             model_name: 模型调用名称
             max_workers: 最大并发线程数
+            dimensions: Matryoshka Embeddings 维度（可选）
 
         Returns:
             embedding 向量列表，顺序与输入一致
@@ -171,31 +335,154 @@ class EmbeddingHandler:
             ModelNotFoundError: 当模型调用名称无效时
         """
         client = self._get_client(model_name)
-        self.logger.info(f"EmbeddingHandler: batch multimodal embedding, count={len(msg_blocks)}, workers={max_workers}")
+        self.logger.info(
+            "EmbeddingHandler: batch multimodal embedding, count=%d, workers=%s",
+            len(msg_blocks), max_workers,
+        )
 
         if len(msg_blocks) == 0:
             return []
 
-        results = [None] * len(msg_blocks)
+        model = client.get_model_name()
+        results: List[List[float]] = [[] for _ in msg_blocks]
+        text_indices, texts, image_indices = self._partition(msg_blocks)
+
+        if text_indices:
+            try:
+                vectors = client.embed(texts, model, dimensions=dimensions)
+                for index, vector in zip(text_indices, vectors):
+                    results[index] = vector
+            except Exception as e:
+                # 批量请求失败时逐个重试，单条失败只影响该条结果
+                self.logger.warning(
+                    "EmbeddingHandler: batched text embedding failed, retrying one by one: %s", e
+                )
+                image_indices = sorted(image_indices + text_indices)
 
-        def process_single(index: int, msg_block: OpenAIMessageBlock):
+        def process_single(index: int):
             """处理单个消息块"""
             try:
-                embedding = self.handle_multimodal(msg_block, None)
-                return index, embedding
+                input_text, extra_body = self._multimodal_input(msg_blocks[index])
+                result = client.embed(input_text, model, extra_body=extra_body, dimensions=dimensions)
+                return index, self._single_vector(result)
             except Exception as e:
-                self.logger.error(f"Multimodal embedding {index} failed: {e}", exc_info=True)
+                self.logger.error(
+                    "Multimodal embedding %d failed: %s", index, e,
+                    exc_info=self.logger.isEnabledFor(logging.DEBUG),
+                )
                 # 返回空向量作为错误标记
                 return index, []
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_index = {
-                executor.submit(process_single, i, msg): i
-                for i, msg in enumerate(msg_blocks)
-            }
-            for future in concurrent.futures.as_completed(future_to_index):
-                index, embedding = future.result()
+        if image_indices:
+            for index, embedding in self._parallel_map(process_single, image_indices, max_workers):
                 results[index] = embedding
 
-        self.logger.debug(f"EmbeddingHandler: completed {len(msg_blocks)} batch multimodal embeddings")
+        self.logger.debug(
+            "EmbeddingHandler: completed %d batch multimodal embeddings",
+            len(msg_blocks),
+        )
+        return results
+
+    async def ahandle_text_batch(
+        self,
+        texts: List[str],
+        model_name: Optional[str] = None,
+        dimensions: Optional[int] = None,
+    ) -> List[List[float]]:
+        """
+        异步处理批量文本 embedding（单次请求），参数与返回值同 handle_text_batch
+
+        Raises:
+            ModelNotFoundError: 当模型调用名称无效时
+            ClientError: 当 API 调用失败时
+        """
+        client = self._get_client(model_name)
+        self.logger.debug(
+            "EmbeddingHandler: async batch text embedding, count=%d, dimensions=%s",
+            len(texts), dimensions,
+        )
+
+        return await client.aembed(texts, client.get_model_name(), dimensions=dimensions)
+
+    async def ahandle_multimodal_batch(
+        self,
+        msg_blocks: List[OpenAIMessageBlock],
+        model_name: Optional[str] = None,
+        dimensions: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> List[List[float]]:
+        """
+        异步处理批量图文混合 embedding
+
+        不含图片的消息块合并为一次批量请求，其余消息块在单个事件循环中并发请求，不占用额外线程。
+
+        Args:
+            msg_blocks: OpenAI 格式的消息块列表
+            model_name: 模型调用名称
+            dimensions: Matryoshka Embeddings 维度（可选）
+            max_concurrency: 同时在途的最大请求数，None 表示不限制
+
+        Returns:
+            embedding 向量列表，顺序与输入一致（失败的条目为空列表）
+
+        Raises:
+            ModelNotFoundError: 当模型调用名称无效时
+        """
+        client = self._get_client(model_name)
+        self.logger.info(
+            "EmbeddingHandler: async batch multimodal embedding, count=%d, max_concurrency=%s",
+            len(msg_blocks), max_concurrency,
+        )
+
+        if len(msg_blocks) == 0:
+            return []
+
+        model = client.get_model_name()
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        async def call_single(index: int, msg_block: OpenAIMessageBlock) -> List[float]:
+            """发出单个请求，失败时返回空向量"""
+            try:
+                input_text, extra_body = self._multimodal_input(msg_block)
+                result = await client.aembed(input_text, model, extra_body=extra_body, dimensions=dimensions)
+                return self._single_vector(result)
+            except Exception as e:
+                self.logger.error(
+                    "Multimodal embedding %d failed: %s", index, e,
+                    exc_info=self.logger.isEnabledFor(logging.DEBUG),
+                )
+                return []
+
+        async def process_single(index: int, msg_block: OpenAIMessageBlock) -> List[float]:
+            """处理单个消息块"""
+            if semaphore is None:
+                return await call_single(index, msg_block)
+            async with semaphore:
+                return await call_single(index, msg_block)
+
+        results: List[List[float]] = [[] for _ in msg_blocks]
+        text_indices, texts, image_indices = self._partition(msg_blocks)
+
+        if text_indices:
+            try:
+                vectors = await client.aembed(texts, model, dimensions=dimensions)
+                for index, vector in zip(text_indices, vectors):
+                    results[index] = vector
+            except Exception as e:
+                self.logger.warning(
+                    "EmbeddingHandler: batched text embedding failed, retrying one by one: %s", e
+                )
+                image_indices = sorted(image_indices + text_indices)
+
+        # gather 按传入顺序返回结果，按索引回填
+        embeddings = await asyncio.gather(
+            *[process_single(i, msg_blocks[i]) for i in image_indices]
+        )
+        for index, embedding in zip(image_indices, embeddings):
+            results[index] = embedding
+
+        self.logger.debug(
+            "EmbeddingHandler: completed %d async batch multimodal embeddings",
+            len(msg_blocks),
+        )
         return results
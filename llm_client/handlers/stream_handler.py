@@ -1,17 +1,18 @@
 # -*- coding: utf-8 -*-
 """流处理器 - 流式聊天处理器"""
 
-from typing import List, Dict, Any, Optional, Iterator, TYPE_CHECKING
+import logging
+from typing import List, Dict, Any, Optional, Iterator, Union
 
-from ..types import StreamChunk, ModelNotFoundError, ClientError
+from ..types import StreamChunk, StreamEvent, ModelNotFoundError, ClientError
 from ..clients.base_client import BaseLLMClient
 from ..parsers.stream_parser import StreamResponseParser
 
-if TYPE_CHECKING:
-    import logging
-
 logger = None  # 将在初始化时注入
 
+# 未注入 logger 时使用的默认 logger
+_default_logger = logging.getLogger(__name__)
+
 
 class StreamHandler:
     """
@@ -46,11 +47,7 @@ class StreamHandler:
         self.clients = clients
         self.default_client_name = default_client_name
 
-        if logger is not None:
-            self.logger = logger
-        else:
-            import logging
-            self.logger = logging.getLogger(__name__)
+        self.logger = logger if logger is not None else _default_logger
 
     def handle(
         self,
@@ -59,7 +56,10 @@ class StreamHandler:
         enable_thinking: bool = False,
         clear_thinking: bool = True,
         max_tokens: Optional[int] = None,
-    ) -> Iterator[StreamChunk]:
+        raw: bool = False,
+        stream_batch_size: Optional[int] = None,
+        events: bool = False,
+    ) -> Iterator[Union[StreamChunk, StreamEvent, Any]]:
         """
         处理流式聊天请求
 
@@ -69,6 +69,9 @@ class StreamHandler:
             enable_thinking: 是否开启思考模式
             clear_thinking: 是否清空之前的思考
             max_tokens: 最大 token 数
+            raw: 为 True 时跳过解析器，直接产出 SDK 的 ChoiceDelta 对象
+            stream_batch_size: 单块最多合并的文本增量数，None 表示逐个输出
+            events: 为 True 时产出 StreamEvent 元组而不是 StreamChunk 字典
 
         Yields:
             StreamChunk: 统一格式的流块：
@@ -85,7 +88,7 @@ class StreamHandler:
         if not client:
             raise ModelNotFoundError(f"Unknown model call name: {client_name}")
 
-        self.logger.debug(f"StreamHandler: calling {client_name}, messages={len(messages)}")
+        self.logger.debug("StreamHandler: calling %s, messages=%d", client_name, len(messages))
 
         try:
             # 获取原始流
@@ -99,15 +102,25 @@ class StreamHandler:
                 max_tokens=max_tokens,
             )
 
+            if raw:
+                # 原始模式：不累积、不包装，调用方自行读取 delta.content / delta.reasoning
+                for chunk in stream:
+                    if chunk.choices:
+                        yield chunk.choices[0].delta
+                return
+
             # 使用解析器处理流
-            parser = StreamResponseParser(logger=self.logger)
+            parser = StreamResponseParser(logger=self.logger, batch_size=stream_batch_size, events=events)
             for chunk in parser.parse(stream):
                 yield chunk
 
-            self.logger.debug(f"StreamHandler: completed successfully")
+            self.logger.debug("StreamHandler: completed successfully")
 
         except ClientError:
             raise
         except Exception as e:
-            self.logger.error(f"StreamHandler error: {str(e)}", exc_info=True)
+            self.logger.error(
+                "StreamHandler error: %s", e,
+                exc_info=self.logger.isEnabledFor(logging.DEBUG),
+            )
             raise ClientError(f"Stream handling failed: {str(e)}") from e
\ No newline at end of file
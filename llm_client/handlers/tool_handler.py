@@ -1,17 +1,18 @@
 # -*- coding: utf-8 -*-
 """工具处理器 - 流式工具调用处理器"""
 
-from typing import List, Dict, Any, Optional, Iterator, TYPE_CHECKING
+import logging
+from typing import List, Dict, Any, Optional, Iterator, Union
 
-from ..types import StreamChunk, ToolDefinition, ModelNotFoundError, ClientError
+from ..types import StreamChunk, StreamEvent, ToolDefinition, ModelNotFoundError, ClientError
 from ..clients.base_client import BaseLLMClient
 from ..parsers.stream_parser import StreamResponseParser
 
-if TYPE_CHECKING:
-    import logging
-
 logger = None  # 将在初始化时注入
 
+# 未注入 logger 时使用的默认 logger
+_default_logger = logging.getLogger(__name__)
+
 
 class ToolHandler:
     """
@@ -48,11 +49,7 @@ class ToolHandler:
         self.clients = clients
         self.default_client_name = default_client_name
 
-        if logger is not None:
-            self.logger = logger
-        else:
-            import logging
-            self.logger = logging.getLogger(__name__)
+        self.logger = logger if logger is not None else _default_logger
 
     def handle(
         self,
@@ -62,7 +59,10 @@ class ToolHandler:
         max_tokens: Optional[int] = None,
         enable_thinking: bool = True,
         clear_thinking: bool = False,  # 工具调用场景通常不清除 thinking
-    ) -> Iterator[StreamChunk]:
+        raw: bool = False,
+        stream_batch_size: Optional[int] = None,
+        events: bool = False,
+    ) -> Iterator[Union[StreamChunk, StreamEvent, Any]]:
         """
         处理流式工具调用请求
 
@@ -73,6 +73,9 @@ class ToolHandler:
             max_tokens: 最大生成 token 数
             enable_thinking: 是否开启思考模式（工具调用场景建议开启）
             clear_thinking: 是否清空之前的思考
+            raw: 为 True 时跳过解析器，直接产出 SDK 的 ChoiceDelta 对象
+            stream_batch_size: 单块最多合并的文本增量数，None 表示逐个输出
+            events: 为 True 时产出 StreamEvent 元组而不是 StreamChunk 字典
 
         Yields:
             StreamChunk: 统一格式的流块：
@@ -90,7 +93,10 @@ class ToolHandler:
         if not client:
             raise ModelNotFoundError(f"Unknown model call name: {client_name}")
 
-        self.logger.info(f"ToolHandler: calling {client_name}, thinking={enable_thinking}, tools={len(tools)}")
+        self.logger.info(
+            "ToolHandler: calling %s, thinking=%s, tools=%d",
+            client_name, enable_thinking, len(tools),
+        )
 
         try:
             # 获取原始流（启用了工具流式调用）
@@ -104,8 +110,15 @@ class ToolHandler:
                 max_tokens=max_tokens,
             )
 
+            if raw:
+                # 原始模式：不累积、不包装，调用方自行读取 delta.content / delta.reasoning
+                for chunk in stream:
+                    if chunk.choices:
+                        yield chunk.choices[0].delta
+                return
+
             # 使用解析器处理流（包括工具调用增量）
-            parser = StreamResponseParser(logger=self.logger)
+            parser = StreamResponseParser(logger=self.logger, batch_size=stream_batch_size, events=events)
             for chunk in parser.parse(stream):
                 yield chunk
 
@@ -114,5 +127,8 @@ class ToolHandler:
         except ClientError:
             raise
         except Exception as e:
-            self.logger.error(f"ToolHandler error: {str(e)}", exc_info=True)
+            self.logger.error(
+                "ToolHandler error: %s", e,
+                exc_info=self.logger.isEnabledFor(logging.DEBUG),
+            )
             raise ClientError(f"Tool handling failed: {str(e)}") from e
\ No newline at end of file
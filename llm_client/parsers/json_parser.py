@@ -1,7 +1,64 @@
 # -*- coding: utf-8 -*-
 """流式 JSON 解析器 - 增量解析简单 {"key": "value"} 格式的 JSON"""
 
-from typing import Optional, Dict, List
+from json.decoder import scanstring
+from typing import Optional, Dict
+
+# 解析状态
+_KEY = 0      # 寻找下一个 key 的起始引号
+_COLON = 1    # key 已结束，等待冒号和 value 的起始字符
+_VALUE = 2    # 位于字符串 value 内部
+_SKIP = 3     # 位于非字符串 value（数字 / 布尔 / null / 嵌套结构）内部
+_DONE = 4     # 顶层对象已结束
+
+_WHITESPACE = " \t\n\r"
+
+
+def _is_escape_start(buffer: str, index: int, start: int) -> bool:
+    """buffer[index] 处的反斜杠是否为转义序列的开头（前面的连续反斜杠成对出现）"""
+    first = index
+    while first > start and buffer[first - 1] == "\\":
+        first -= 1
+    return (index - first) % 2 == 0
+
+
+def _closing_quote(buffer: str, start: int) -> int:
+    """查找 buffer[start:] 中字符串的结束引号位置（跳过被转义的引号），未找到返回 -1"""
+    quote = buffer.find('"', start)
+    while quote >= 0:
+        if _is_escape_start(buffer, quote, start):
+            return quote
+        quote = buffer.find('"', quote + 1)
+    return -1
+
+
+def _safe_end(buffer: str, start: int) -> int:
+    """
+    返回 buffer[start:] 中可以安全解码的前缀终点
+
+    末尾未接收完整的转义序列（单独的反斜杠，或不足 4 位的 \\uXXXX）留到下次 feed 再解码；
+    末尾的高位代理项 \\uD800-\\uDBFF 也留下，等待与后续的低位代理项组成一个字符，
+    避免输出孤立的代理项。
+    """
+    end = len(buffer)
+    cut = end
+    last = buffer.rfind("\\", start)
+    if last >= 0 and _is_escape_start(buffer, last, start):
+        if end - last < 2 or (buffer[last + 1] == "u" and end - last < 6):
+            cut = last
+
+    # 截断点之前紧邻一个完整的高位代理项转义时一并留下
+    high = cut - 6
+    if (
+        high >= start
+        and buffer[high] == "\\"
+        and buffer[high + 1] == "u"
+        and buffer[high + 2] in "dD"
+        and buffer[high + 3] in "89abAB"
+        and _is_escape_start(buffer, high, start)
+    ):
+        cut = high
+    return cut
 
 
 class StreamingJSONParser:
@@ -9,17 +66,14 @@ class StreamingJSONParser:
     增量 JSON 解析器，只处理简单的 {"key": "value"} 格式
 
     用于流式工具调用场景，逐步解析工具参数 JSON。
-    支持转义字符和 Unicode 转义序列处理。
+    字符串由 json.decoder.scanstring（json.loads 使用的 C 实现）整段解码，
+    转义字符和 \\uXXXX 序列与 json.loads 结果一致；未接收完整的转义序列会等待后续片段。
+    非字符串 value（数字、布尔、null、嵌套对象 / 数组）被跳过，不产生增量。
 
     Attributes:
-        buffer: 完整累积的 JSON 字符串
-        prev_buffer_len: 上一次 feed 时的 buffer 长度
-        current_key: 当前正在解析的 key
-        in_key: 是否在解析 key
-        in_value: 是否在解析 value
-        escape_next: 是否处理转义字符
-        unicode_chars: Unicode 转义序列缓存（用于 \\uXXXX）
-        current_delta: 当前 key 的增量缓存
+        buffer: 尚未处理完的 JSON 尾部（已解析的前缀会被丢弃）
+        prev_buffer_len: 本次 feed 追加片段之前的 buffer 长度
+        current_key: 当前（或最近一个）value 所属的 key
 
     Example:
         >>> parser = StreamingJSONParser()
@@ -31,27 +85,14 @@ class StreamingJSONParser:
         {'name': 'John'}
     """
 
-    # JSON 转义序列映射
-    ESCAPE_MAP = {
-        '"': '"',
-        '\\': '\\',
-        'n': '\n',
-        't': '\t',
-        'r': '\r',
-        'b': '\b',
-        'f': '\f',
-    }
-
     def __init__(self):
         """初始化解析器状态"""
         self.buffer: str = ""
         self.prev_buffer_len: int = 0
         self.current_key: Optional[str] = None
-        self.in_key: bool = False
-        self.in_value: bool = False
-        self.escape_next: bool = False
-        self.unicode_chars: List[str] = []
-        self.current_delta: str = ""
+        self._state: int = _KEY
+        self._pos: int = 0          # 下一个待处理字符在 buffer 中的位置（每次 feed 结束后为 0）
+        self._depth: int = 0        # 跳过非字符串 value 时的嵌套深度
 
     def feed(self, chunk: str) -> Optional[Dict[str, str]]:
         """
@@ -61,87 +102,125 @@ class StreamingJSONParser:
             chunk: 新增的 JSON 片段
 
         Returns:
-            返回格式: {"key": "delta_value"}，如果没有增量则返回 None
+            返回格式: {"key": "delta_value"}（一个片段跨越多个 key 时包含多项），
+            如果没有增量则返回 None
         """
         self.prev_buffer_len = len(self.buffer)
+        if not chunk:
+            return None
         self.buffer += chunk
-        self.current_delta = ""
-
-        i = self.prev_buffer_len
-        while i < len(self.buffer):
-            char = self.buffer[i]
-
-            # 处理 Unicode 转义序列 \\uXXXX
-            if self.unicode_chars:
-                # 正在收集 Unicode 的 4 个十六进制字符
-                self.unicode_chars.append(char)
-                if len(self.unicode_chars) == 4:
-                    # Unicode 序列完成，转换为字符
-                    hex_str = ''.join(self.unicode_chars)
-                    try:
-                        unicode_char = chr(int(hex_str, 16))
-                    except ValueError:
-                        unicode_char = hex_str  # 转换失败，保持原样
-                    if self.in_value and self.current_key:
-                        self.current_delta += unicode_char
-                    self.unicode_chars = []
-                i += 1
-                continue
-
-            # 处理转义字符（当前字节在转义序列中）
-            if self.escape_next:
-                if self.in_value and self.current_key:
-                    if char == 'u':
-                        # Unicode 转义序列开始，收集后续 4 个字符
-                        self.unicode_chars = []
-                    else:
-                        # 将转义序列转换为实际字符
-                        escaped_char = self.ESCAPE_MAP.get(char, char)
-                        self.current_delta += escaped_char
-                self.escape_next = False
-                i += 1
-                continue
-
-            if char == "\\" and self.in_value:
-                # 遇到转义符号，标记下一个字符需要转义处理
-                self.escape_next = True
-                i += 1
-                continue
-
-            # 状态机逻辑
-            # 跳过非关键字符，只关注 key 和 value 的字符串内容
-            if char == '"':
-                if not self.in_key and not self.in_value:
-                    # 字符串开始，判断是 key 还是 value
-                    if self.current_key is None:
-                        self.in_key = True
-                        self.current_key = ""
-                    else:
-                        self.in_value = True
-                elif self.in_key:
-                    # key 结束
-                    self.in_key = False
-                elif self.in_value:
-                    # value 结束
-                    self.in_value = False
-
-            elif self.in_key:
-                self.current_key += char
-            elif self.in_value and self.current_key:
-                # 只输出本次新增的部分
-                self.current_delta += char
-
-            i += 1
-
-        return {self.current_key: self.current_delta} if self.current_key and self.current_delta else None
+        deltas: Dict[str, str] = {}
+
+        buffer = self.buffer
+        end = len(buffer)
+        pos = self._pos
+
+        while pos < end and self._state != _DONE:
+            state = self._state
+
+            if state == _KEY:
+                quote = buffer.find('"', pos)
+                close = buffer.find("}", pos, quote if quote >= 0 else end)
+                if close >= 0:
+                    self._state = _DONE
+                    pos = close + 1
+                    break
+                if quote < 0:
+                    pos = end
+                    break
+                if _closing_quote(buffer, quote + 1) < 0:
+                    # key 尚未接收完整，从起始引号处等待
+                    pos = quote
+                    break
+                self.current_key, pos = self._decode(buffer, quote + 1)
+                self._state = _COLON
+
+            elif state == _COLON:
+                char = buffer[pos]
+                if char in _WHITESPACE or char == ":":
+                    pos += 1
+                elif char == '"':
+                    self._state = _VALUE
+                    pos += 1
+                else:
+                    self._state = _SKIP
+                    self._depth = 0
+
+            elif state == _VALUE:
+                quote = buffer.find('"', pos)
+                backslash = buffer.find("\\", pos, quote if quote >= 0 else end)
+                if backslash < 0:
+                    # 常见情况：结束引号（或片段末尾）之前没有转义，直接切片
+                    if quote < 0:
+                        self._add(deltas, buffer[pos:])
+                        pos = end
+                        break
+                    self._add(deltas, buffer[pos:quote])
+                    pos = quote + 1
+                    self._state = _KEY
+                    continue
+                # 含转义：先定位结束引号，未结束时只解码已完整接收的部分
+                # （scanstring 失败时的异常会统计整个 buffer 的行列号，不能作为常规路径）
+                if quote < 0 or _closing_quote(buffer, backslash) < 0:
+                    safe = _safe_end(buffer, pos)
+                    if safe > pos:
+                        text, _ = self._decode(buffer[pos:safe] + '"', 0)
+                        self._add(deltas, text)
+                    pos = safe
+                    break
+                text, pos = self._decode(buffer, pos)
+                self._add(deltas, text)
+                self._state = _KEY
+
+            else:  # _SKIP
+                char = buffer[pos]
+                if char == '"':
+                    if _closing_quote(buffer, pos + 1) < 0:
+                        break
+                    _, pos = self._decode(buffer, pos + 1)
+                    continue
+                if char in "{[":
+                    self._depth += 1
+                elif char in "}]":
+                    if self._depth == 0:
+                        self._state = _DONE
+                    self._depth -= 1
+                elif char == "," and self._depth == 0:
+                    self._state = _KEY
+                pos += 1
+
+        # 已处理的前缀不会再被访问，只保留未处理完的尾部（如未结束的转义或 key），
+        # 使 buffer 的长度和每次拼接的拷贝量与片段大小相当，而不是随参数总长增长
+        if pos:
+            self.buffer = buffer[pos:]
+        self._pos = 0
+        return deltas or None
+
+    @staticmethod
+    def _decode(buffer: str, start: int):
+        """
+        解码从 start 开始、已确认有结束引号的字符串
+
+        Returns:
+            (解码后的字符串, 结束引号之后的位置)；含非法转义时按原文返回
+        """
+        try:
+            return scanstring(buffer, start, False)
+        except ValueError:
+            quote = _closing_quote(buffer, start)
+            return buffer[start:quote], quote + 1
+
+    def _add(self, deltas: Dict[str, str], text: str) -> None:
+        """累加当前 key 的增量"""
+        if text:
+            key = self.current_key
+            deltas[key] = deltas.get(key, "") + text
 
     def reset(self) -> None:
         """重置解析器以用于新的解析任务"""
         self.buffer = ""
         self.prev_buffer_len = 0
         self.current_key = None
-        self.in_key = False
-        self.in_value = False
-        self.escape_next = False
-        self.unicode_chars = []
-        self.current_delta = ""
\ No newline at end of file
+        self._state = _KEY
+        self._pos = 0
+        self._depth = 0
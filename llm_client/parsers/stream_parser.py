@@ -1,16 +1,21 @@
 # -*- coding: utf-8 -*-
 """流响应解析器 - 解析 OpenAI 原始流并生成统一的 StreamChunk 格式"""
 
-from typing import Iterator, Dict, Any, Optional, List, TYPE_CHECKING
+import logging
+import time
+from typing import Iterator, Dict, Any, Optional, List, Union
 
 from .json_parser import StreamingJSONParser
-from ..types import StreamChunk, AssistantMessage
-
-if TYPE_CHECKING:
-    import logging
+from ..types import StreamChunk, StreamEvent, AssistantMessage
 
 logger = None  # 将在初始化时注入
 
+# 未注入 logger 时使用的默认 logger
+_default_logger = logging.getLogger(__name__)
+
+# 合并文本增量时，每次输出后批大小的增长倍数
+_BATCH_GROWTH = 3.0
+
 
 class StreamResponseParser:
     """
@@ -22,7 +27,18 @@ class StreamResponseParser:
     - 工具调用增量（流式 JSON 解析）
     - 生成统一格式的 StreamChunk
 
+    设置 batch_size 后，连续的同类文本增量（reasoning 或 content）会合并输出：
+    第一个增量立即输出（不影响首字延迟），之后每批合并的增量数按倍数增长到 batch_size；
+    距上次输出超过 flush_ms 时，下一个增量到达即输出。reasoning 与 content 不会合并到同一块。
+
+    设置 events=True 后输出 StreamEvent 元组而不是 StreamChunk 字典，减少每个增量的对象分配。
+    每次产出的块都是新对象，调用方可以安全地保留（如 list(parser.parse(stream))），
+    解析器不会在之后修改已产出的块。
+
     Attributes:
+        batch_size: 单块最多合并的文本增量数，None 表示不合并
+        flush_ms: 合并等待上限（毫秒）
+        events: 是否输出 StreamEvent
         logger: 注入的 logger 实例
 
     Example:
@@ -34,24 +50,56 @@ class StreamResponseParser:
         ...         print(chunk["tool_call"])
     """
 
-    def __init__(self, logger=None):
+    def __init__(
+        self,
+        logger=None,
+        batch_size: Optional[int] = None,
+        flush_ms: float = 50,
+        events: bool = False,
+    ):
         """
         初始化解析器
 
         Args:
             logger: 可选的 logger 实例，默认使用标准 logging
+            batch_size: 单块最多合并的文本增量数，None 或 1 表示逐个输出（默认）
+            flush_ms: 合并等待上限（毫秒），仅在新增量到达时检查
+            events: 为 True 时输出 StreamEvent，否则输出 StreamChunk 字典（默认）
         """
-        if logger is not None:
-            self.logger = logger
-        else:
-            import logging
-            self.logger = logging.getLogger(__name__)
-
-        self.reasoning_content: str = ""
-        self.content: str = ""
-        self.tool_calls: Dict[int, Dict[str, Any]] = {}
-
-    def parse(self, stream: Iterator) -> Iterator[StreamChunk]:
+        self.logger = logger if logger is not None else _default_logger
+
+        self.batch_size = batch_size if batch_size and batch_size > 1 else None
+        self.flush_ms = flush_ms
+        self.events = events
+
+        # 文本增量先追加到列表，读取时再拼接，避免逐块 += 反复拷贝整段文本
+        self._reasoning_parts: List[str] = []
+        self._content_parts: List[str] = []
+        # 按 tool_call.index 存放的工具调用，及与之平行的参数片段和流式 JSON 解析器
+        self.tool_calls: List[Optional[Dict[str, Any]]] = []
+        self._argument_parts: List[List[str]] = []
+        self._json_parsers: List[Optional[StreamingJSONParser]] = []
+        self._reset_pending()
+
+    @property
+    def reasoning_content(self) -> str:
+        """已累积的推理内容"""
+        return "".join(self._reasoning_parts)
+
+    @property
+    def content(self) -> str:
+        """已累积的文本内容"""
+        return "".join(self._content_parts)
+
+    def _reset_pending(self) -> None:
+        """重置待合并的文本增量"""
+        self._pending_kind: Optional[str] = None
+        self._pending_parts: List[str] = []
+        self._pending_id: Optional[str] = None
+        self._pending_since: float = 0.0
+        self._batch_target: int = 1
+
+    def parse(self, stream: Iterator) -> Iterator[Union[StreamChunk, StreamEvent]]:
         """
         解析原始流并生成 StreamChunk
 
@@ -63,6 +111,7 @@ class StreamResponseParser:
                 - content_stream: {"id": ..., "content": ...} 或 {"id": ..., "content": ...} (reasoning)
                 - tool_call: {"id": ..., "function": {"name": ..., "arguments": ...}}
                 - complete: 最终完整消息
+            events=True 时为对应 kind 的 StreamEvent
 
         Raises:
             StreamParsingError: 当流解析失败时
@@ -76,15 +125,20 @@ class StreamResponseParser:
 
                 yield from self._process_chunk(chunk)
 
-            # 发送最终完成消息
-            yield {"complete": self._build_final_message()}
+            # 输出剩余的合并增量，再发送最终完成消息
+            yield from self._flush_pending()
+            message = self._build_final_message()
+            yield StreamEvent("complete", None, complete=message) if self.events else {"complete": message}
 
         except Exception as e:
-            self.logger.error(f"Stream processing error: {str(e)}", exc_info=True)
+            self.logger.error(
+                "Stream processing error: %s", e,
+                exc_info=self.logger.isEnabledFor(logging.DEBUG),
+            )
             from ..types import StreamParsingError
             raise StreamParsingError(f"Stream parsing failed: {str(e)}") from e
 
-    def _process_chunk(self, chunk: Any) -> Iterator[StreamChunk]:
+    def _process_chunk(self, chunk: Any) -> Iterator[Union[StreamChunk, StreamEvent]]:
         """
         处理单个 chunk
 
@@ -97,21 +151,79 @@ class StreamResponseParser:
         delta = chunk.choices[0].delta
         chunk_id = chunk.id
 
-        # 处理思考内容 - 新版本 GLM-4.7 使用 'reasoning' 字段
-        if hasattr(delta, "reasoning") and delta.reasoning:
-            self.reasoning_content += delta.reasoning
-            yield {"content_stream": {"id": chunk_id, "content": delta.reasoning}}
-
+        # 每个字段只取一次属性（带默认值的 getattr 比 hasattr + 再次访问更省）
+        # 思考内容 - 新版本 GLM-4.7 使用 'reasoning' 字段
+        reasoning = getattr(delta, "reasoning", None)
         # 处理普通文本内容
-        if delta.content:
-            self.content += delta.content
-            yield {"content_stream": {"id": chunk_id, "content": delta.content}}
+        content = getattr(delta, "content", None)
+
+        if reasoning and content and self.batch_size is None and not self.events:
+            # 思考结束的过渡 chunk 可能同时带有两者；字典格式下两者本就不区分类别，
+            # 合并为一个 content_stream 块输出，省去一次生成器挂起和下游的重复处理
+            self._reasoning_parts.append(reasoning)
+            self._content_parts.append(content)
+            yield {"content_stream": {"id": chunk_id, "content": reasoning + content}}
+        else:
+            if reasoning:
+                self._reasoning_parts.append(reasoning)
+                yield from self._emit_text("reasoning", chunk_id, reasoning)
+            if content:
+                self._content_parts.append(content)
+                yield from self._emit_text("content", chunk_id, content)
+
+        # 处理工具调用（先输出已合并的文本，保证顺序）
+        tool_calls = getattr(delta, "tool_calls", None)
+        if tool_calls:
+            yield from self._flush_pending()
+            yield from self._process_tool_calls(tool_calls, chunk)
+
+    def _emit_text(self, kind: str, chunk_id: str, text: str) -> Iterator[Union[StreamChunk, StreamEvent]]:
+        """
+        输出文本增量，开启合并时按批输出
+
+        Args:
+            kind: "reasoning" 或 "content"，不同类别不会合并
+            chunk_id: 当前 chunk 的 id
+            text: 文本增量
 
-        # 处理工具调用
-        if delta.tool_calls:
-            yield from self._process_tool_calls(delta.tool_calls, chunk)
+        Yields:
+            StreamChunk: content_stream 块
+        """
+        if self.batch_size is None:
+            if self.events:
+                yield StreamEvent(kind, chunk_id, text)
+            else:
+                yield {"content_stream": {"id": chunk_id, "content": text}}
+            return
 
-    def _process_tool_calls(self, tool_calls: Any, chunk: Any) -> Iterator[StreamChunk]:
+        if self._pending_kind != kind:
+            # 切换类别（如 reasoning -> content）时，新类别的第一个增量同样立即输出
+            yield from self._flush_pending()
+            self._pending_kind = kind
+            self._batch_target = 1
+
+        self._pending_parts.append(text)
+        self._pending_id = chunk_id
+
+        if (
+            len(self._pending_parts) >= self._batch_target
+            or (time.monotonic() - self._pending_since) * 1000 >= self.flush_ms
+        ):
+            yield from self._flush_pending()
+            self._batch_target = min(self.batch_size, int(self._batch_target * _BATCH_GROWTH))
+
+    def _flush_pending(self) -> Iterator[Union[StreamChunk, StreamEvent]]:
+        """输出已合并的文本增量"""
+        if self._pending_parts:
+            text = "".join(self._pending_parts)
+            if self.events:
+                yield StreamEvent(self._pending_kind, self._pending_id, text)
+            else:
+                yield {"content_stream": {"id": self._pending_id, "content": text}}
+            self._pending_parts = []
+        self._pending_since = time.monotonic()
+
+    def _process_tool_calls(self, tool_calls: Any, chunk: Any) -> Iterator[Union[StreamChunk, StreamEvent]]:
         """
         处理工具调用增量
 
@@ -129,42 +241,61 @@ class StreamResponseParser:
 
         for tool_call in tool_calls:
             idx = tool_call.index
-            if idx not in self.tool_calls:
-                self.tool_calls[idx] = {
-                    "id": tool_call.id,
-                    "function": {"name": "", "arguments": "", "json_parser": StreamingJSONParser()}
-                }
+            # index 从 0 开始连续编号，按需扩展列表
+            while len(self.tool_calls) <= idx:
+                self.tool_calls.append(None)
+                self._argument_parts.append([])
+                self._json_parsers.append(None)
+
+            entry = self.tool_calls[idx]
+            if entry is None:
+                entry = self.tool_calls[idx] = {"id": tool_call.id, "function": {"name": ""}}
+                self._json_parsers[idx] = StreamingJSONParser()
+            function = entry["function"]
+
+            delta_function = tool_call.function
+            if delta_function is None:
+                continue
+            name = delta_function.name
+            arguments = delta_function.arguments
 
             # 处理工具名称
-            if tool_call.function and tool_call.function.name:
-                self.tool_calls[idx]["function"]["name"] = tool_call.function.name
-                yield {
-                    "tool_call": {
-                        "id": self.tool_calls[idx]["id"],
-                        "function": {"name": tool_call.function.name, "arguments": ""}
-                    }
-                }
-
-            # 处理工具参数
-            if tool_call.function and tool_call.function.arguments:
+            if name:
+                function["name"] = name
+                yield self._tool_call_chunk({
+                    "id": entry["id"],
+                    "function": {"name": name, "arguments": ""}
+                }, "tool_call_start")
+
+            # 处理工具参数（部分服务会发送空字符串增量，直接跳过，不进入解析器）
+            if arguments:
                 # 保持原始累积（用于最终消息兼容性）
-                self.tool_calls[idx]["function"]["arguments"] += tool_call.function.arguments
+                self._argument_parts[idx].append(arguments)
 
                 # 使用流式 JSON 解析器
-                parser = self.tool_calls[idx]["function"]["json_parser"]
-                deltas = parser.feed(tool_call.function.arguments)
+                deltas = self._json_parsers[idx].feed(arguments)
 
                 # 如果有增量 delta，输出解析后的对象
                 if deltas:
-                    yield {
-                        "tool_call": {
-                            "id": self.tool_calls[idx]["id"],
-                            "function": {
-                                "name": self.tool_calls[idx]["function"]["name"],
-                                "arguments": deltas
-                            }
+                    yield self._tool_call_chunk({
+                        "id": entry["id"],
+                        "function": {
+                            "name": function["name"],
+                            "arguments": deltas
                         }
-                    }
+                    })
+
+    def _tool_call_chunk(self, tool_call: Dict[str, Any], kind: str = "tool_call") -> Union[StreamChunk, StreamEvent]:
+        """
+        包装工具调用增量
+
+        事件模式下工具名称通告的 kind 为 "tool_call_start"（arguments 为空字符串），
+        参数增量为 "tool_call"（arguments 总是 {key: delta} 字典），调用方按 kind 分派即可，
+        无需再判断 arguments 的类型。
+        """
+        if self.events:
+            return StreamEvent(kind, tool_call["id"], tool_call=tool_call)
+        return {"tool_call": tool_call}
 
     def _build_final_message(self) -> AssistantMessage:
         """
@@ -173,29 +304,30 @@ class StreamResponseParser:
         Returns:
             AssistantMessage: 完整的助手消息
         """
-        # 清理 tool_calls 中的 json_parser（仅用于内部状态）
-        clean_tool_calls = None
-        if self.tool_calls:
-            clean_tool_calls = [
-                {
-                    "id": tc["id"],
-                    "function": {
-                        "name": tc["function"]["name"],
-                        "arguments": tc["function"]["arguments"]
-                    }
-                }
-                for tc in self.tool_calls.values()
-            ]
+        # 按 index 顺序输出，参数片段在此一次性拼接
+        clean_tool_calls = [
+            {
+                "id": tc["id"],
+                "function": {"name": tc["function"]["name"], "arguments": "".join(parts)}
+            }
+            for tc, parts in zip(self.tool_calls, self._argument_parts)
+            if tc is not None
+        ] or None
+        content = "".join(self._content_parts)
+        reasoning_content = "".join(self._reasoning_parts)
 
         return {
             "role": "assistant",
-            "content": self.content if self.content else None,
-            "reasoning_content": self.reasoning_content if self.reasoning_content else None,
+            "content": content or None,
+            "reasoning_content": reasoning_content or None,
             "tool_calls": clean_tool_calls
         }
 
     def reset(self) -> None:
         """重置解析器状态，用于新的解析任务"""
-        self.reasoning_content = ""
-        self.content = ""
-        self.tool_calls = {}
\ No newline at end of file
+        self._reasoning_parts = []
+        self._content_parts = []
+        self.tool_calls = []
+        self._argument_parts = []
+        self._json_parsers = []
+        self._reset_pending()
\ No newline at end of file
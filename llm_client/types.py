@@ -1,15 +1,53 @@
 # -*- coding: utf-8 -*-
 """类型定义模块 - 提供 LLM 处理器所需的所有 TypedDict 类型"""
 
-from typing import TypedDict, Dict, Any, List, Optional, Union
+import enum
+from typing import TypedDict, NamedTuple, ClassVar, Dict, Any, List, Literal, Optional, Sequence, Union
+
+from . import _json
+from ._schema_cache import schema_validator
+
+# fastjsonschema 可选：安装时使用预编译的校验函数，否则退回手写的结构检查
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
 
 
 # ==================== 消息类型 ====================
 
+class TextContent(TypedDict):
+    """文本内容块"""
+    type: Literal["text"]
+    text: str
+
+
+class ImageURL(TypedDict, total=False):
+    """图像地址（OpenAI 格式要求嵌套在 image_url 字段中）"""
+    url: str  # http(s) URL 或 data:image/...;base64,...
+    detail: str  # "auto" / "low" / "high"
+
+
+class ImageContent(TypedDict):
+    """图像内容块"""
+    type: Literal["image_url"]
+    image_url: ImageURL
+
+
+class ImagePILContent(TypedDict):
+    """PIL 图像内容块（仅用于多模态 embedding，上传前编码为 base64）"""
+    type: Literal["image_pil"]
+    image_pil: Any  # PIL.Image.Image；PIL 为可选依赖，此处不引用其类型
+
+
+# 消息内容块：文本、图像 URL、PIL 图像
+ContentPart = Union[TextContent, ImageContent, ImagePILContent]
+
+
 class Message(TypedDict, total=False):
     """聊天消息类型"""
     role: str
-    content: Union[str, List[Dict[str, Any]]]
+    content: Union[str, List[ContentPart]]
 
 
 class AssistantMessage(TypedDict, total=False):
@@ -17,13 +55,7 @@ class AssistantMessage(TypedDict, total=False):
     role: str
     content: Optional[str]
     reasoning_content: Optional[str]
-    tool_calls: Optional[List[Dict[str, Any]]]
-
-
-class ImageContent(TypedDict):
-    """图像内容块"""
-    type: str  # "image_url"
-    image_url: Dict[str, Any]
+    tool_calls: Optional[List["ToolCall"]]
 
 
 # ==================== 工具类型 ====================
@@ -44,7 +76,9 @@ class ToolDefinition(TypedDict):
 class ToolCallFunction(TypedDict, total=False):
     """工具调用函数"""
     name: str
-    arguments: Union[str, Dict[str, str]]  # Dict[str, str] 用于流式增量
+    # 最终消息与流式名称通告中为 str，流式参数增量中为 Dict[str, str]；
+    # 事件模式下两种流式情况分别对应 kind "tool_call_start" / "tool_call"
+    arguments: Union[str, Dict[str, str]]
 
 
 class ToolCall(TypedDict):
@@ -73,16 +107,17 @@ class JSONSchema(TypedDict, total=False):
         ...     "required": ["name", "age"]
         ... }
     """
+    # total=False 已表示各字段可省略；值本身不允许为 null，因此不再包一层 Optional
     type: str
-    properties: Optional[Dict[str, Any]]
-    required: Optional[List[str]]
-    additionalProperties: Optional[bool]
-    items: Optional[Any]
-    enum: Optional[List[Any]]
-    minimum: Optional[Union[int, float]]
-    maximum: Optional[Union[int, float]]
-    format: Optional[str]
-    description: Optional[str]
+    properties: Dict[str, Any]
+    required: List[str]
+    additionalProperties: bool
+    items: Any
+    enum: List[Any]
+    minimum: Union[int, float]
+    maximum: Union[int, float]
+    format: str
+    description: str
 
 
 # ==================== LLM 调用选项 ====================
@@ -126,11 +161,80 @@ class CompleteMessage(TypedDict):
     complete: AssistantMessage
 
 
-class StreamChunk(TypedDict, total=False):
-    """流式块（内容/工具/完成）"""
-    content_stream: Union[ContentStreamDelta, ReasoningStreamDelta]
-    tool_call: ToolCall
-    complete: AssistantMessage
+# 流式块（内容/工具/完成）：每个块只含三个键之一，以键名区分类别。
+# 定义为联合类型而不是 total=False 的单个 TypedDict，类型检查器可以按 "content_stream" in chunk 收窄
+StreamChunk = Union[ContentStream, ToolCallStream, CompleteMessage]
+
+
+# StreamEvent.kind 的取值；调用方可用 {kind: handler} 字典一次查找完成分派
+StreamEventKind = Literal["reasoning", "content", "tool_call_start", "tool_call", "complete"]
+
+
+class StreamEvent(NamedTuple):
+    """
+    流式事件（events=True 时代替 StreamChunk 字典输出）
+
+    每个事件只分配一个元组，不再构造嵌套字典；kind 同时区分了 reasoning 与 content。
+    NamedTuple 自带 __match_args__，Python 3.10+ 可直接用于 match 的类模式，
+    如 case StreamEvent("content", _, text)。
+
+    Attributes:
+        kind: "reasoning" / "content" / "tool_call_start" / "tool_call" / "complete"
+        id: chunk id（reasoning / content）或工具调用 id（tool_call_start / tool_call），complete 时为 None
+        content: 文本增量，仅 reasoning / content 事件有值
+        tool_call: 工具调用增量，格式同 StreamChunk 的 tool_call；tool_call_start 通告工具名称
+            （arguments 为 ""），tool_call 携带参数增量（arguments 为 {key: delta} 字典）
+        complete: 最终完整消息
+    """
+    kind: StreamEventKind
+    id: Optional[str]
+    content: Optional[str] = None
+    tool_call: Optional[ToolCall] = None
+    complete: Optional[AssistantMessage] = None
+
+
+def encode_chunk(chunk: Union[StreamChunk, StreamEvent]) -> bytes:
+    """
+    将流式块序列化为 UTF-8 JSON bytes（如转发为 SSE / WebSocket 消息）
+
+    安装 orjson 时在 C 层完成序列化。StreamEvent 编码为只含非 None 字段的对象，
+    可由 decode_chunk 还原。
+
+    Args:
+        chunk: StreamChunk 字典或 StreamEvent
+
+    Returns:
+        紧凑的 JSON bytes
+
+    Example:
+        >>> encode_chunk({"content_stream": {"id": "1", "content": "Hi"}})
+        b'{"content_stream":{"id":"1","content":"Hi"}}'
+        >>> encode_chunk(StreamEvent("content", "1", "Hi"))
+        b'{"kind":"content","id":"1","content":"Hi"}'
+    """
+    if isinstance(chunk, StreamEvent):
+        chunk = {
+            field: value
+            for field, value in zip(StreamEvent._fields, chunk)
+            if value is not None or field == "id"
+        }
+    return _json.dumps_bytes(chunk)
+
+
+def decode_chunk(data: Union[str, bytes]) -> Union[StreamChunk, StreamEvent]:
+    """
+    解析 encode_chunk 的输出
+
+    Args:
+        data: JSON 字符串或 bytes
+
+    Returns:
+        StreamChunk 字典；含 kind 字段时还原为 StreamEvent
+    """
+    obj = _json.loads(data)
+    if "kind" in obj:
+        return StreamEvent(**obj)
+    return obj
 
 
 # ==================== 模型配置类型 ====================
@@ -145,8 +249,13 @@ class ModelConfig(TypedDict):
     audio: bool
 
 
-class MappedModelConfig(TypedDict):
-    """映射后的模型配置（内部使用）"""
+class MappedModelConfig(NamedTuple):
+    """
+    映射后的模型配置（内部使用）
+
+    与 StreamEvent 相同采用 NamedTuple：字段存于元组槽位，没有逐实例的字典，
+    且兼容 Python 3.8（dataclass(slots=True) 需要 3.10）。
+    """
     client: Any  # OpenAI client instance
     model_name: str
     vision: bool
@@ -159,33 +268,220 @@ class MappedModelConfig(TypedDict):
 class OpenAIMessageBlock(TypedDict, total=False):
     """OpenAI 消息块格式（用于多模态 embedding）"""
     role: str
-    content: List[Dict[str, Any]]
+    content: List[ContentPart]
 
 
 class EmbeddingResponse(TypedDict, total=False):
     """Embedding 响应"""
-    embedding: List[float]
+    embedding: Sequence[float]  # list[float]；embedding_format="array" 时为 array.array("f")
     tokens: int
     index: int  # 批量场景下对应的原始索引
 
 
 # ==================== 错误类型 ====================
 
+class ErrorKind(enum.IntEnum):
+    """错误类别（LLMError.kind）"""
+    GENERIC = 0
+    MODEL_NOT_FOUND = 1
+    STREAM_PARSE = 2
+    CLIENT = 3
+    VALIDATION = 4
+
+
 class LLMError(Exception):
-    """LLM 处理器基础错误类"""
-    pass
+    """
+    LLM 处理器基础错误类
+
+    各子类声明空的 __slots__，不再为子类实例额外增加 __dict__ / __weakref__ 槽位；
+    kind 为机器可读的错误类别，可以只捕获 LLMError 再按 kind 分支，
+    子类仍然保留，except ModelNotFoundError 等写法不受影响。
+
+    Example:
+        >>> try:
+        ...     handler.call_llm(messages, model_name="unknown")
+        ... except LLMError as e:
+        ...     if e.kind is ErrorKind.MODEL_NOT_FOUND:
+        ...         ...
+    """
+    __slots__ = ()
+    kind: ClassVar[ErrorKind] = ErrorKind.GENERIC
 
 
 class ModelNotFoundError(LLMError):
     """模型未找到错误"""
-    pass
+    __slots__ = ()
+    kind: ClassVar[ErrorKind] = ErrorKind.MODEL_NOT_FOUND
 
 
 class StreamParsingError(LLMError):
     """流式响应解析错误"""
-    pass
+    __slots__ = ()
+    kind: ClassVar[ErrorKind] = ErrorKind.STREAM_PARSE
 
 
 class ClientError(LLMError):
     """LLM 客户端调用错误"""
-    pass
\ No newline at end of file
+    __slots__ = ()
+    kind: ClassVar[ErrorKind] = ErrorKind.CLIENT
+
+
+class ValidationError(LLMError):
+    """消息或工具定义格式错误"""
+    __slots__ = ()
+    kind: ClassVar[ErrorKind] = ErrorKind.VALIDATION
+
+
+# ==================== 运行时校验 ====================
+
+_MESSAGE_SCHEMA: Dict[str, Any] = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "role": {"type": "string"},
+            "content": {
+                "anyOf": [
+                    {"type": "string"},
+                    {"type": "null"},
+                    {"type": "array", "items": {"type": "object", "required": ["type"]}},
+                ]
+            },
+        },
+        "required": ["role"],
+    },
+}
+
+_TOOL_SCHEMA: Dict[str, Any] = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "type": {"const": "function"},
+            "function": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "description": {"type": "string"},
+                    "parameters": {"type": "object"},
+                },
+                "required": ["name"],
+            },
+        },
+        "required": ["type", "function"],
+    },
+}
+
+# 在导入时编译一次，之后每次校验直接调用生成的函数
+_message_validator = fastjsonschema.compile(_MESSAGE_SCHEMA) if fastjsonschema is not None else None
+_tool_validator = fastjsonschema.compile(_TOOL_SCHEMA) if fastjsonschema is not None else None
+
+
+def validate_messages(messages: List[Message]) -> None:
+    """
+    校验聊天消息列表的结构
+
+    Args:
+        messages: 聊天消息列表
+
+    Raises:
+        ValidationError: 当消息结构不合法时
+
+    Example:
+        >>> validate_messages([{"role": "user", "content": "Hello"}])
+        >>> validate_messages([{"content": "Hello"}])
+        Traceback (most recent call last):
+        ...
+        llm_client.types.ValidationError: ...
+    """
+    if _message_validator is not None:
+        try:
+            _message_validator(messages)
+        except fastjsonschema.JsonSchemaException as e:
+            raise ValidationError(f"Invalid messages: {e.message}") from e
+        return
+
+    if not isinstance(messages, list):
+        raise ValidationError("Invalid messages: must be a list")
+    for i, message in enumerate(messages):
+        if not isinstance(message, dict) or not isinstance(message.get("role"), str):
+            raise ValidationError(f"Invalid messages: item {i} must be an object with a string 'role'")
+        content = message.get("content")
+        if content is None or isinstance(content, str):
+            continue
+        if not isinstance(content, list) or not all(
+            isinstance(part, dict) and "type" in part for part in content
+        ):
+            raise ValidationError(f"Invalid messages: item {i} content must be a string or a list of typed parts")
+
+
+def validate_tools(tools: List[ToolDefinition]) -> None:
+    """
+    校验工具定义列表的结构
+
+    Args:
+        tools: 工具定义列表
+
+    Raises:
+        ValidationError: 当工具定义结构不合法时
+    """
+    if _tool_validator is not None:
+        try:
+            _tool_validator(tools)
+        except fastjsonschema.JsonSchemaException as e:
+            raise ValidationError(f"Invalid tools: {e.message}") from e
+        return
+
+    if not isinstance(tools, list):
+        raise ValidationError("Invalid tools: must be a list")
+    for i, tool in enumerate(tools):
+        function = tool.get("function") if isinstance(tool, dict) else None
+        if (
+            not isinstance(function, dict)
+            or tool.get("type") != "function"
+            or not isinstance(function.get("name"), str)
+        ):
+            raise ValidationError(f"Invalid tools: item {i} must be a function tool with a string 'name'")
+
+
+def validate_json_output(text: str, schema: JSONSchema) -> Any:
+    """
+    解析结构化输出（json_schema 调用的返回文本）并按 schema 校验
+
+    编译后的校验函数按 schema 缓存，重复校验同一 schema 不会重新编译。
+    未安装 fastjsonschema 时只检查 JSON 是否合法及顶层 required 字段。
+
+    Args:
+        text: 模型返回的 JSON 文本
+        schema: 调用时使用的 JSON Schema
+
+    Returns:
+        解析后的 JSON 对象
+
+    Raises:
+        ValidationError: 当文本不是合法 JSON 或不符合 schema 时
+
+    Example:
+        >>> schema = {"type": "object", "required": ["name"]}
+        >>> validate_json_output(handler.call_llm(messages, json_schema=schema), schema)
+        {'name': 'John'}
+    """
+    try:
+        data = _json.loads(text)
+    except ValueError as e:
+        raise ValidationError(f"Invalid JSON output: {e}") from e
+
+    validator = schema_validator(schema)
+    if validator is not None:
+        try:
+            validator(data)
+        except fastjsonschema.JsonSchemaException as e:
+            raise ValidationError(f"JSON output does not match schema: {e.message}") from e
+        return data
+
+    required = schema.get("required") if isinstance(schema, dict) else None
+    if required:
+        missing = [key for key in required if not isinstance(data, dict) or key not in data]
+        if missing:
+            raise ValidationError(f"JSON output does not match schema: missing {missing}")
+    return data
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""响应缓存测试"""
+
+import array
+import time
+
+from llm_client import LLMHandler
+from llm_client._cache import MISS, ResponseCache, make_cache_key
+
+
+def test_cache_key_ignores_dict_order():
+    a = make_cache_key(
+        "main", [{"role": "user", "content": "hi"}], {"max_tokens": 1, "stream": False}
+    )
+    b = make_cache_key(
+        "main", [{"content": "hi", "role": "user"}], {"stream": False, "max_tokens": 1}
+    )
+    assert a == b
+    assert a != make_cache_key("main", [{"role": "user", "content": "hello"}])
+
+
+def test_lru_eviction():
+    cache = ResponseCache(maxsize=2, ttl=None)
+    cache.set(b"a", 1)
+    cache.set(b"b", 2)
+    assert cache.get(b"a") == 1  # a 变为最近使用
+    cache.set(b"c", 3)
+    assert cache.get(b"b") is MISS
+    assert cache.get(b"a") == 1
+    assert cache.get(b"c") == 3
+    assert len(cache) == 2
+
+
+def test_ttl_expiry():
+    cache = ResponseCache(maxsize=4, ttl=0.05)
+    cache.set(b"a", "x")
+    assert cache.get(b"a") == "x"
+    time.sleep(0.06)
+    assert cache.get(b"a") is MISS
+    assert len(cache) == 0
+
+
+def test_falsy_values_are_hits():
+    cache = ResponseCache(maxsize=4, ttl=None)
+    cache.set(b"none", None)
+    cache.set(b"empty", "")
+    assert cache.get(b"none") is None
+    assert cache.get(b"empty") == ""
+
+
+def _handler(monkeypatch, vector):
+    handler = LLMHandler(
+        [{"call_name": "embedding", "name": "emb", "api_key": "k", "api_base": "http://127.0.0.1:1/v1"}],
+        cache_size=8,
+    )
+    calls = []
+
+    def handle_text(text, model_name=None, dimensions=None):
+        calls.append(text)
+        return vector()
+
+    def handle_text_batch(texts, model_name=None, dimensions=None):
+        calls.extend(texts)
+        return [vector() for _ in texts]
+
+    monkeypatch.setattr(handler.embedding_handler, "handle_text", handle_text)
+    monkeypatch.setattr(handler.embedding_handler, "handle_text_batch", handle_text_batch)
+    return handler, calls
+
+
+def test_embed_cache_keeps_vector_type(monkeypatch):
+    handler, calls = _handler(monkeypatch, lambda: array.array("f", [1.0, 2.0]))
+    miss = handler.embed_text("abc")
+    hit = handler.embed_text("abc")
+    assert calls == ["abc"]
+    assert type(miss) is type(hit) is array.array
+    hit[0] = 9.0
+    assert handler.embed_text("abc")[0] == 1.0  # 修改返回值不影响缓存
+
+
+def test_batch_embed_cache_returns_uniform_types(monkeypatch):
+    handler, calls = _handler(monkeypatch, lambda: array.array("f", [1.0]))
+    handler.embed_text("a")
+    vectors = handler.batch_embed_text(["a", "b"])
+    assert calls == ["a", "b"]
+    assert [type(v) for v in vectors] == [array.array, array.array]
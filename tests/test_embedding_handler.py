@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""EmbeddingHandler 测试：批量多模态请求并发执行"""
+
+import threading
+
+import pytest
+
+from llm_client.handlers.embedding_handler import EmbeddingHandler
+
+
+class BarrierClient:
+    """embed 调用在屏障处等待，所有请求同时在途时才会返回"""
+
+    def __init__(self, parties):
+        self.barrier = threading.Barrier(parties, timeout=5)
+
+    def get_model_name(self):
+        return "emb"
+
+    def embed(self, input_data, model_name, extra_body=None, dimensions=None):
+        self.barrier.wait()
+        return [float(len(input_data))]
+
+
+@pytest.fixture
+def handler():
+    handler = EmbeddingHandler({"embedding": BarrierClient(4)}, default_client_name="embedding")
+    yield handler
+    handler.close()
+
+
+def test_parallel_map_submits_all_before_collecting(handler):
+    barrier = threading.Barrier(4, timeout=5)
+
+    def fn(index):
+        # 串行提交-等待时第一个任务会在屏障处超时
+        barrier.wait()
+        return index, [float(index)]
+
+    results = dict(handler._parallel_map(fn, [0, 1, 2, 3], max_workers=4))
+    assert results == {i: [float(i)] for i in range(4)}
+
+
+def test_multimodal_batch_runs_image_requests_concurrently(handler):
+    blocks = [
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "x" * (i + 1)},
+                {"type": "image_url", "image_url": {"url": f"http://img/{i}"}},
+            ],
+        }
+        for i in range(4)
+    ]
+    results = handler.handle_multimodal_batch(blocks, max_workers=4)
+    # 任一请求未能与其余请求同时在途时屏障超时，该项返回空向量
+    assert all(results)
+    assert [len(vector) for vector in results] == [1, 1, 1, 1]
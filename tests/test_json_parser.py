@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""StreamingJSONParser 测试：任意切分位置的增量结果与 json.loads 一致"""
+
+import json
+
+import pytest
+
+from llm_client.parsers.json_parser import StreamingJSONParser
+
+DOCUMENTS = [
+    '{"city": "Beijing", "unit": "celsius"}',
+    '{"text": "line1\\nline2\\t\\"quoted\\" \\\\ end"}',
+    '{"text": "caf\\u00e9 \\u4e2d\\u6587"}',
+    '{"emoji": "a\\ud83d\\ude00b", "next": "\\ud83d\\udc4d"}',
+    '{"n": 1, "flag": true, "nested": {"k": "v"}, "list": ["x", 2], "s": "ok"}',
+    '{"path": "C:\\\\dir\\\\", "after": "\\/"}',
+    '{"escaped \\"key\\"": "value"}',
+]
+
+
+def _collect(chunks):
+    """依次 feed 所有片段，按 key 拼接增量"""
+    parser = StreamingJSONParser()
+    result = {}
+    for chunk in chunks:
+        delta = parser.feed(chunk)
+        if delta is None:
+            continue
+        for key, text in delta.items():
+            # 增量中不应出现孤立的代理项
+            text.encode("utf-8")
+            result[key] = result.get(key, "") + text
+    return result
+
+
+def _expected(document):
+    """json.loads 结果中的字符串 value"""
+    return {key: value for key, value in json.loads(document).items() if isinstance(value, str)}
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_single_chunk(document):
+    assert _collect([document]) == _expected(document)
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_every_two_way_split(document):
+    expected = _expected(document)
+    for i in range(len(document) + 1):
+        assert _collect([document[:i], document[i:]]) == expected, i
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_char_by_char(document):
+    assert _collect(list(document)) == _expected(document)
+
+
+def test_split_inside_unicode_escape_waits_for_rest():
+    parser = StreamingJSONParser()
+    assert parser.feed('{"a": "x\\u00') == {"a": "x"}
+    assert parser.feed("e9") == {"a": "\u00e9"}
+
+
+def test_high_surrogate_waits_for_low_surrogate():
+    parser = StreamingJSONParser()
+    assert parser.feed('{"a": "\\ud83d') is None
+    assert parser.feed('\\ude00"}') == {"a": "\U0001F600"}
+
+
+def test_empty_chunk_returns_none():
+    parser = StreamingJSONParser()
+    parser.feed('{"a": "x')
+    assert parser.feed("") is None
+    assert parser.feed('y"}') == {"a": "y"}
+
+
+def test_reset():
+    parser = StreamingJSONParser()
+    parser.feed('{"a": "x"}')
+    parser.reset()
+    assert parser.feed('{"b": "y"}') == {"b": "y"}
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""OpenAIClient 图片编码测试"""
+
+import pytest
+
+from llm_client.clients.openai_client import OpenAIClient
+
+
+@pytest.fixture
+def client():
+    return OpenAIClient(api_key="k", base_url="http://127.0.0.1:1/v1")
+
+
+@pytest.mark.parametrize(
+    "data, mime",
+    [
+        (b"\x89PNG\r\n\x1a\n\x00\x00", "image/png"),
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF", "image/jpeg"),
+        (b"GIF89a\x01\x00", "image/gif"),
+        (b"RIFF\x24\x00\x00\x00WEBPVP8 ", "image/webp"),
+        (b"not an image", "application/octet-stream"),
+    ],
+)
+def test_image_bytes_mime(client, data, mime):
+    for value in (data, bytearray(data), memoryview(data)):
+        (url,) = client._encode_single_image(value)
+        assert url.startswith(f"data:{mime};base64,")
+
+
+def test_image_strings_pass_through(client):
+    assert client._encode_single_image("https://img/a.png") == ["https://img/a.png"]
+    data_url = "data:image/gif;base64,R0lG"
+    assert client._encode_single_image(data_url) == [data_url]
+    assert client._encode_single_image(["abc"]) == ["data:image/png;base64,abc"]
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""重试与熔断测试"""
+
+import time
+
+import httpx
+import openai
+
+from llm_client._retry import CircuitBreaker, call_with_retry
+from llm_client.handlers.batch_handler import BatchHandler
+
+
+def _connection_error():
+    return openai.APIConnectionError(request=httpx.Request("POST", "http://test/v1/chat/completions"))
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(threshold=2, cooldown=60)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_breaker_half_open_allows_single_probe():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()  # 探测进行中，其余请求仍直接失败
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_breaker_failed_probe_reopens():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_call_with_retry_retries_transient_errors():
+    attempts = []
+
+    def func():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _connection_error()
+        return "ok"
+
+    assert call_with_retry(func, retries=2, base_delay=0, jitter=0) == "ok"
+    assert len(attempts) == 3
+
+
+def test_call_with_retry_does_not_retry_other_errors():
+    attempts = []
+
+    def func():
+        attempts.append(1)
+        raise ValueError("bad")
+
+    try:
+        call_with_retry(func, retries=2, base_delay=0, jitter=0)
+    except ValueError:
+        pass
+    assert len(attempts) == 1
+
+
+class FailingClient:
+    """chat 总是抛出连接错误"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_model_name(self):
+        return "m"
+
+    def chat(self, messages, **kwargs):
+        self.calls += 1
+        raise _connection_error()
+
+
+def test_batch_breaker_disabled_by_default():
+    client = FailingClient()
+    handler = BatchHandler({"main": client}, default_client_name="main")
+    results = handler.handle(
+        [[{"role": "user", "content": str(i)}] for i in range(8)],
+        max_workers=1,
+    )
+    assert client.calls == 8
+    assert len(results) == 8
+
+
+def test_batch_breaker_skips_after_threshold():
+    client = FailingClient()
+    handler = BatchHandler(
+        {"main": client}, default_client_name="main", breaker_threshold=3, breaker_cooldown=60
+    )
+    results = handler.handle(
+        [[{"role": "user", "content": str(i)}] for i in range(8)],
+        max_workers=1,
+        return_exceptions=True,
+    )
+    assert client.calls == 3
+    assert all(isinstance(result, Exception) for result in results)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""schema 缓存与请求体片段嵌入测试"""
+
+import json
+
+import pytest
+
+from llm_client import _json
+from llm_client._schema_cache import FrozenSchema, freeze_schema
+from llm_client.clients.openai_client import _embed_fragments
+
+SCHEMA = {"type": "object", "properties": {"name": {"type": "string"}}}
+
+
+def _body(schema_text):
+    return {"model": "m", "structured_outputs": {"json": schema_text}}
+
+
+def test_freeze_schema_marks_dict_results_only():
+    frozen = freeze_schema(SCHEMA)
+    assert type(frozen) is FrozenSchema
+    assert json.loads(frozen) == SCHEMA
+    assert freeze_schema(SCHEMA) is frozen
+
+    text = '{"type": "object"}'
+    assert type(freeze_schema(text)) is str
+    assert freeze_schema(text) is text
+
+
+def test_caller_strings_are_not_embedded():
+    body = _body("not json {")
+    assert _embed_fragments(body) is body
+    # 调用方的字符串仍作为转义后的 JSON 字符串发送
+    assert json.loads(_json.dumps_bytes(body))["structured_outputs"]["json"] == "not json {"
+
+
+@pytest.mark.skipif(not _json.HAS_FRAGMENT, reason="orjson.Fragment requires orjson >= 3.9")
+def test_frozen_schema_embedded_as_object():
+    body = _body(freeze_schema(SCHEMA))
+    encoded = json.loads(_json.dumps_bytes(_embed_fragments(body)))
+    assert encoded["structured_outputs"]["json"] == SCHEMA
+    # 原字典不被修改
+    assert type(body["structured_outputs"]["json"]) is FrozenSchema
+
+
+@pytest.mark.skipif(not _json.HAS_FRAGMENT, reason="orjson.Fragment requires orjson >= 3.9")
+def test_valid_caller_string_stays_a_string():
+    text = json.dumps(SCHEMA)
+    encoded = json.loads(_json.dumps_bytes(_embed_fragments(_body(text))))
+    assert encoded["structured_outputs"]["json"] == text